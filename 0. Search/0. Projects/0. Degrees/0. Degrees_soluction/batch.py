@@ -0,0 +1,170 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from multiprocessing import Pool, shared_memory
+
+from graph import CompactGraph
+from server import QueryServer, read_batch
+from snapshot import load_graph
+
+# The only graph arrays a search touches; names and titles stay in the parent
+SHARED_FIELDS = ("person_offsets", "person_movies", "movie_offsets", "movie_people", "components")
+
+# Set in each worker by attach_graph
+worker_graph = None
+worker_memory = None
+
+
+def share_graph(graph):
+    """
+    Copies the search arrays into one shared memory block. Returns the block
+    and the (name, typecode, offset, length) layout workers need to map it.
+    """
+    layout = []
+    size = 0
+    for field in SHARED_FIELDS:
+        view = memoryview(getattr(graph, field))
+        layout.append((field, view.format, size, view.nbytes))
+        size += (view.nbytes + 7) // 8 * 8
+
+    memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for field, _, offset, length in layout:
+        memory.buf[offset:offset + length] = memoryview(getattr(graph, field)).cast("B")
+    return memory, layout
+
+
+def attach_graph(name, layout, overlay):
+    """
+    Pool initializer: maps the parent's shared block as a search-only graph
+    and layers on the parent's unsnapshotted changes, which are small.
+    """
+    global worker_graph, worker_memory
+    worker_memory = shared_memory.SharedMemory(name=name)
+    fields = dict.fromkeys(CompactGraph.FIELDS)
+    for field, typecode, offset, length in layout:
+        fields[field] = worker_memory.buf[offset:offset + length].cast(typecode)
+    worker_graph = CompactGraph(**fields)
+    for field, value in overlay.items():
+        setattr(worker_graph, field, value)
+
+
+def search_chunk(chunk):
+    return [None if pair is None else worker_graph.shortest_path(*pair) for pair in chunk]
+
+
+def chunked(queries, size):
+    chunk = []
+    for query in queries:
+        chunk.append(query)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ResultWriter():
+    """Streams results as JSON lines, or as CSV when the output ends in .csv."""
+
+    def __init__(self, graph, f, as_csv):
+        self.graph = graph
+        self.f = f
+        self.csv = csv.writer(f) if as_csv else None
+        if self.csv:
+            self.csv.writerow(["source", "target", "degrees", "path", "error"])
+
+    def write(self, query, path=None, error=None):
+        source = query.get("source", query.get("source_id"))
+        target = query.get("target", query.get("target_id"))
+        degrees = None if path is None else len(path)
+        steps = None if path is None else [
+            [self.graph.movie_ids[m], self.graph.person_ids[p]] for m, p in path
+        ]
+        if self.csv:
+            joined = "" if steps is None else " ".join(f"{m}/{p}" for m, p in steps)
+            self.csv.writerow([source, target, "" if degrees is None else degrees,
+                               joined, error or ""])
+        else:
+            result = {"source": source, "target": target, "degrees": degrees, "path": steps}
+            if error:
+                result["error"] = error
+            self.f.write(json.dumps(result) + "\n")
+
+
+def run(graph, queries, writer, workers, chunk_size):
+    """
+    Resolves names in the parent, fans (source, target) ints out to a pool
+    attached to shared memory and writes results back in input order.
+    `queries` yields (query, error) pairs as read_batch does; lines that
+    are not queries are written as error rows. Returns the number of
+    queries answered.
+    """
+    resolver = QueryServer(graph)
+
+    # Pool.imap returns chunks in submission order, so queries queue up here
+    # as they are resolved and are matched back to results first in, first out
+    order = deque()
+
+    def resolved():
+        for query, error in queries:
+            pair = None
+            if error is None and not isinstance(query, dict):
+                query, error = None, "bad request: query must be a JSON object"
+            if error is None:
+                try:
+                    pair = (resolver.resolve(query, "source"), resolver.resolve(query, "target"))
+                except (LookupError, ValueError, TypeError) as resolve_error:
+                    error = str(resolve_error)
+            order.append((query or {}, error))
+            yield pair
+
+    answered = 0
+    memory, layout = share_graph(graph)
+    overlay = {field: getattr(graph, field) for field in CompactGraph.OVERLAY}
+    try:
+        with Pool(workers, initializer=attach_graph,
+                  initargs=(memory.name, layout, overlay)) as pool:
+            for paths in pool.imap(search_chunk, chunked(resolved(), chunk_size)):
+                for path in paths:
+                    query, error = order.popleft()
+                    writer.write(query, path=path, error=error)
+                    answered += 1
+    finally:
+        memory.close()
+        memory.unlink()
+    return answered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a file of Degrees queries in parallel")
+    parser.add_argument("queries", help="JSON lines or 'source,target' CSV rows")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("-o", "--output", help="write here instead of stdout (.csv for CSV)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args()
+
+    graph = load_graph(args.directory)
+    queries = read_batch(args.queries)
+
+    f = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        writer = ResultWriter(graph, f, as_csv=bool(args.output) and args.output.endswith(".csv"))
+        start = time.perf_counter()
+        answered = run(graph, queries, writer, args.workers, args.chunk_size)
+        elapsed = time.perf_counter() - start
+    finally:
+        if f is not sys.stdout:
+            f.close()
+
+    rate = answered / elapsed if elapsed else 0
+    print(f"Answered {answered} queries in {elapsed:.2f}s with {args.workers} workers "
+          f"({rate:.0f} queries/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import degrees
+from graph import CompactGraph
+from snapshot import FILENAME, read_snapshot, source_stamps, write_snapshot
+from util import DisjointSet, QueueFrontier, HashQueueFrontier
+
+
+def time_search(search, source, target):
+    start = time.perf_counter()
+    path = search(source, target)
+    elapsed = time.perf_counter() - start
+    return path, elapsed, degrees.num_explored
+
+
+def compare_searches(pairs):
+    print(f"{'source':>10} {'target':>10} {'degrees':>7} "
+          f"{'bfs ms':>9} {'bfs nodes':>9} {'bidi ms':>9} {'bidi nodes':>10}")
+
+    totals = [0.0, 0, 0.0, 0]
+    for source, target in pairs:
+        path, bfs_time, bfs_nodes = time_search(degrees.shortest_path, source, target)
+        bidi_path, bidi_time, bidi_nodes = time_search(
+            degrees.bidirectional_shortest_path, source, target
+        )
+        if (path is None) != (bidi_path is None) or (path and len(path) != len(bidi_path)):
+            raise Exception(f"searches disagree for {source} -> {target}")
+
+        distance = "-" if path is None else len(path)
+        print(f"{source:>10} {target:>10} {distance:>7} "
+              f"{bfs_time * 1000:>9.2f} {bfs_nodes:>9} {bidi_time * 1000:>9.2f} {bidi_nodes:>10}")
+
+        totals[0] += bfs_time
+        totals[1] += bfs_nodes
+        totals[2] += bidi_time
+        totals[3] += bidi_nodes
+
+    print(f"{'total':>29} {totals[0] * 1000:>9.2f} {totals[1]:>9} "
+          f"{totals[2] * 1000:>9.2f} {totals[3]:>10}")
+
+
+def compare_frontiers(pairs):
+    print(f"{'frontier':>18} {'queries':>7} {'nodes':>9} {'total ms':>10}")
+    for frontier_class in (QueueFrontier, HashQueueFrontier):
+        elapsed = 0.0
+        nodes = 0
+        for source, target in pairs:
+            start = time.perf_counter()
+            degrees.shortest_path(source, target, frontier_class=frontier_class)
+            elapsed += time.perf_counter() - start
+            nodes += degrees.num_explored
+        print(f"{frontier_class.__name__:>18} {len(pairs):>7} {nodes:>9} {elapsed * 1000:>10.2f}")
+
+
+def compare_storage(directory, pairs):
+    """Compares memory held by the dict dataset and the CSR graph, then query time."""
+    reset_dataset()
+    tracemalloc.start()
+    degrees.load_data(directory)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    graph = CompactGraph.from_csv(directory)
+    compact_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    dict_time = 0.0
+    compact_time = 0.0
+    for source, target in pairs:
+        start = time.perf_counter()
+        path = degrees.shortest_path(source, target)
+        dict_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        compact_path = graph.shortest_path(graph.person_index(source), graph.person_index(target))
+        compact_time += time.perf_counter() - start
+        if (path is None) != (compact_path is None) or (path and len(path) != len(compact_path)):
+            raise Exception(f"graphs disagree for {source} -> {target}")
+
+    print(f"{'storage':>8} {'memory MiB':>11} {'query ms':>10}")
+    print(f"{'dicts':>8} {dict_bytes / 2 ** 20:>11.1f} {dict_time * 1000:>10.2f}")
+    print(f"{'csr':>8} {compact_bytes / 2 ** 20:>11.1f} {compact_time * 1000:>10.2f}")
+
+
+def reset_dataset():
+    degrees.names.clear()
+    degrees.people.clear()
+    degrees.movies.clear()
+    degrees.components = DisjointSet()
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def peak_memory(function, *args):
+    """Peak bytes allocated by Python while function runs."""
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a non-empty list."""
+    values = sorted(values)
+    return values[max(0, min(len(values) - 1, round(q / 100 * len(values)) - 1))]
+
+
+def latencies(function, calls):
+    times = []
+    for args in calls:
+        start = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def run_suite(directory, num_queries, seed):
+    """
+    Times loading, neighbor expansion and every search over query sets fixed
+    by the seed, returning a flat {metric: value} dict. Times are in
+    milliseconds and memory in MiB.
+    """
+    metrics = {}
+
+    reset_dataset()
+    metrics["load_data.peak_mib"] = peak_memory(degrees.load_data, directory) / 2 ** 20
+    reset_dataset()
+    metrics["load_data.ms"] = timed(degrees.load_data, directory)[0] * 1000
+
+    metrics["compact.peak_mib"] = peak_memory(CompactGraph.from_csv, directory) / 2 ** 20
+    elapsed, graph = timed(CompactGraph.from_csv, directory)
+    metrics["compact.from_csv.ms"] = elapsed * 1000
+    # Time a snapshot of our own so the dataset's cached one is left alone
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, FILENAME)
+        stamps = source_stamps(directory)
+        write_snapshot(graph, path, stamps)
+        metrics["compact.snapshot.ms"] = timed(read_snapshot, path, stamps)[0] * 1000
+
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    people = [(rng.choice(person_ids),) for _ in range(1000)]
+    pairs = [tuple(rng.sample(person_ids, 2)) for _ in range(num_queries)]
+    compact_pairs = [(graph.person_index(a), graph.person_index(b)) for a, b in pairs]
+
+    timings = {
+        "neighbors_for_person": latencies(degrees.neighbors_for_person, people),
+        "shortest_path": latencies(degrees.shortest_path, pairs),
+        "bidirectional_shortest_path": latencies(degrees.bidirectional_shortest_path, pairs),
+        "compact.shortest_path": latencies(graph.shortest_path, compact_pairs),
+    }
+    for name, times in timings.items():
+        metrics[f"{name}.p50_ms"] = percentile(times, 50) * 1000
+        metrics[f"{name}.p99_ms"] = percentile(times, 99) * 1000
+    return metrics
+
+
+def record_suite(path, entry):
+    """Appends entry to the JSON lines file at path and returns the last comparable one."""
+    previous = None
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                old = json.loads(line)
+                if all(old.get(key) == entry[key] for key in ("dataset", "queries", "seed")):
+                    previous = old
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+    return previous
+
+
+def print_suite(metrics, previous=None):
+    print(f"{'metric':>40} {'value':>10} {'previous':>10} {'change':>8}")
+    for name, value in metrics.items():
+        line = f"{name:>40} {value:>10.3f}"
+        if previous and name in previous["metrics"]:
+            old = previous["metrics"][name]
+            change = f"{(value - old) / old * 100:+.1f}%" if old else "-"
+            line += f" {old:>10.3f} {change:>8}"
+        print(line)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Degrees search strategies")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("-n", "--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=50)
+    parser.add_argument("--frontiers", action="store_true",
+                        help="compare frontier implementations instead of search strategies")
+    parser.add_argument("--compact", action="store_true",
+                        help="compare dict and CSR graph storage instead of search strategies")
+    parser.add_argument("--suite", action="store_true",
+                        help="run the full timing and memory suite and record the results")
+    parser.add_argument("--record", default="benchmarks.jsonl",
+                        help="JSON lines file --suite appends to and compares against")
+    args = parser.parse_args()
+
+    if args.suite:
+        metrics = run_suite(args.directory, args.queries, args.seed)
+        previous = record_suite(args.record, {
+            "time": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "dataset": os.path.abspath(args.directory),
+            "queries": args.queries,
+            "seed": args.seed,
+            "metrics": metrics,
+        })
+        print_suite(metrics, previous)
+        return
+
+    start = time.perf_counter()
+    degrees.load_data(args.directory)
+    print(f"Loaded {args.directory} in {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(args.seed)
+    person_ids = sorted(degrees.people)
+    pairs = [tuple(rng.sample(person_ids, 2)) for _ in range(args.queries)]
+    if args.compact:
+        compare_storage(args.directory, pairs)
+    elif args.frontiers:
+        compare_frontiers(pairs)
+    else:
+        compare_searches(pairs)
+
+
+if __name__ == "__main__":
+    main()
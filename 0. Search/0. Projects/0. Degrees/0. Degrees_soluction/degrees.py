@@ -1,13 +1,34 @@
+import argparse
 import csv
+import json
 import sys
+from bisect import bisect_left, insort
 from collections import deque
 
+from delta import append_delta, read_delta, validate
+from landmarks import load_landmarks
+from nameindex import NameIndex
+from snapshot import load_graph
+from util import DisjointSet, HashQueueFrontier, component_stats, parse_year, year_range
+
 names = {}
 people = {}
 movies = {}
 
+# Union-find over person_ids; people who never shared a movie are apart.
+# Removals never split a set, so after one it may still join people who are
+# no longer connected, but it never separates people who are
+components = DisjointSet()
+
+# Sorted name index for prefix and fuzzy lookups, built by load_data
+name_index = None
+
+# Number of people expanded by the last search
+num_explored = 0
+
 
 def load_data(directory):
+    global name_index
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
@@ -41,16 +62,202 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    for person in people.values():
+        person["decades"] = decade_buckets(person["movies"])
+
+    for person_id in people:
+        components.add(person_id)
+    for movie in movies.values():
+        stars = iter(movie["stars"])
+        first = next(stars, None)
+        for person_id in stars:
+            components.union(first, person_id)
+
+    name_index = NameIndex.build(
+        ((person["name"], person_id) for person_id, person in people.items()),
+        {person_id: len(person["movies"]) for person_id, person in people.items()},
+    )
+
+    for change in read_delta(directory):
+        apply_change(change)
+
+
+def add_person(person_id, name, birth=""):
+    if person_id in people:
+        raise ValueError(f"person {person_id} already exists")
+    people[person_id] = {"name": name, "birth": birth, "movies": set(), "decades": {}}
+    names.setdefault(name.lower(), set()).add(person_id)
+    components.add(person_id)
+    name_index.add(name, person_id)
+
+
+def remove_person(person_id):
+    person = people.pop(person_id)
+    for movie_id in person["movies"]:
+        movies[movie_id]["stars"].discard(person_id)
+    names[person["name"].lower()].discard(person_id)
+    if not names[person["name"].lower()]:
+        del names[person["name"].lower()]
+    name_index.remove(person_id)
+
+
+def add_movie(movie_id, title, year=""):
+    if movie_id in movies:
+        raise ValueError(f"movie {movie_id} already exists")
+    movies[movie_id] = {"title": title, "year": year, "stars": set()}
+
+
+def remove_movie(movie_id):
+    movie = movies.pop(movie_id)
+    for person_id in movie["stars"]:
+        people[person_id]["movies"].discard(movie_id)
+        unfile_movie(people[person_id]["decades"], movie_id, movie["year"])
+        name_index.set_count(person_id, len(people[person_id]["movies"]))
+
+
+def add_star(person_id, movie_id):
+    person = people[person_id]
+    movie = movies[movie_id]
+    for other_id in movie["stars"]:
+        components.union(person_id, other_id)
+        break
+    if movie_id not in person["movies"]:
+        file_movie(person["decades"], movie_id, movie["year"])
+    person["movies"].add(movie_id)
+    movie["stars"].add(person_id)
+    name_index.set_count(person_id, len(person["movies"]))
+
+
+def remove_star(person_id, movie_id):
+    if movie_id in people[person_id]["movies"]:
+        unfile_movie(people[person_id]["decades"], movie_id, movies[movie_id]["year"])
+    people[person_id]["movies"].discard(movie_id)
+    movies[movie_id]["stars"].discard(person_id)
+    name_index.set_count(person_id, len(people[person_id]["movies"]))
+
+
+def decade_buckets(movie_ids):
+    """
+    Groups movie_ids by release decade into {decade: [(year, movie_id), ...]}
+    with each bucket sorted, so a year range skips whole decades and only
+    binary searches the ones at its ends. Unknown years go under decade 0.
+    """
+    buckets = {}
+    for movie_id in movie_ids:
+        year = parse_year(movies[movie_id]["year"])
+        buckets.setdefault(year // 10 * 10, []).append((year, movie_id))
+    for bucket in buckets.values():
+        bucket.sort()
+    return buckets
+
+
+def file_movie(buckets, movie_id, year):
+    year = parse_year(year)
+    insort(buckets.setdefault(year // 10 * 10, []), (year, movie_id))
+
+
+def unfile_movie(buckets, movie_id, year):
+    year = parse_year(year)
+    bucket = buckets[year // 10 * 10]
+    bucket.remove((year, movie_id))
+    if not bucket:
+        del buckets[year // 10 * 10]
+
+
+def movies_in_years(person_id, years):
+    """Movies person_id starred in that were released within the inclusive (start, end)."""
+    start, end = years
+    movie_ids = []
+    for decade, bucket in people[person_id]["decades"].items():
+        if decade + 9 < start or decade > end:
+            continue
+        if start <= decade and decade + 9 <= end:
+            movie_ids.extend(movie_id for _, movie_id in bucket)
+        else:
+            first = bisect_left(bucket, (start,))
+            last = bisect_left(bucket, (end + 1,), first)
+            movie_ids.extend(movie_id for _, movie_id in bucket[first:last])
+    return movie_ids
+
+
+def apply_change(change):
+    """Applies one delta change (see delta.OPERATIONS) to the loaded data."""
+    op = change["op"]
+    if op == "add_person":
+        add_person(change["id"], change["name"], change["birth"])
+    elif op == "remove_person":
+        remove_person(change["id"])
+    elif op == "add_movie":
+        add_movie(change["id"], change["title"], change["year"])
+    elif op == "remove_movie":
+        remove_movie(change["id"])
+    elif op == "add_star":
+        add_star(change["person_id"], change["movie_id"])
+    elif op == "remove_star":
+        remove_star(change["person_id"], change["movie_id"])
+
+
+def ingest(directory, changes, apply=apply_change):
+    """
+    Applies changes to the loaded data (or with `apply` set to
+    CompactGraph.apply_change, to a compact graph) and appends the ones
+    that succeeded to the delta log for `directory`, so the next load
+    replays them.
+    """
+    applied = []
+    try:
+        for change in changes:
+            apply(validate(change))
+            applied.append(change)
+    finally:
+        append_delta(directory, applied)
+    return len(applied)
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(description="Find degrees of separation between two people")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--bidirectional", action="store_true",
+                        help="search from both people and meet in the middle")
+    parser.add_argument("--compact", action="store_true",
+                        help="load an integer-indexed CSR graph instead of dicts")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="with --compact, parse the CSVs instead of using a snapshot")
+    parser.add_argument("--landmarks", type=int, default=0, metavar="K",
+                        help="with --compact, estimate degrees and guide search with K landmarks")
+    parser.add_argument("--components", action="store_true",
+                        help="print connected component statistics and exit")
+    parser.add_argument("--ingest", metavar="CHANGES",
+                        help="apply a JSON lines file of changes and add it to the delta log")
+    parser.add_argument("--years", metavar="RANGE",
+                        help="only use movies released in RANGE, e.g. 1950-1979, -1979 or 1980-")
+    args = parser.parse_args()
+    if args.years:
+        try:
+            args.years = year_range(args.years)
+        except ValueError as error:
+            parser.error(str(error))
+    if args.compact and args.bidirectional:
+        parser.error("--bidirectional is not supported with --compact")
+    if args.landmarks and not args.compact:
+        parser.error("--landmarks requires --compact")
+
+    if args.compact:
+        compact_main(args.directory, cache=not args.no_cache, landmarks=args.landmarks,
+                     stats=args.components, years=args.years, changes=args.ingest)
+        return
 
     print("Loading data...")
-    load_data(directory)
+    load_data(args.directory)
     print("Data loaded.")
 
+    if args.components:
+        print_component_stats(component_stats(components.component_sizes()))
+        return
+    if args.ingest:
+        print(f"Ingested {ingest(args.directory, read_changes(args.ingest))} changes.")
+        return
+
     source = person_id_for_name(input("Name: "))
     if source is None:
         sys.exit("Person not found.")
@@ -58,7 +265,10 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if args.bidirectional:
+        path = bidirectional_shortest_path(source, target, years=args.years)
+    else:
+        path = shortest_path(source, target, years=args.years)
 
     if path is None:
         print("Not connected.")
@@ -73,13 +283,79 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def read_changes(filename):
+    with open(filename, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compact_main(directory, cache=True, landmarks=0, stats=False, years=None, changes=None):
+    print("Loading data...")
+    graph = load_graph(directory, cache=cache)
+    if changes:
+        print(f"Ingested {ingest(directory, read_changes(changes), graph.apply_change)} changes.")
+        return
+    if landmarks:
+        oracle = load_landmarks(directory, graph, landmarks)
+    print("Data loaded.")
+
+    if stats:
+        print_component_stats(graph.component_stats())
+        return
+
+    source = person_for_name(graph, input("Name: "))
+    if source is None:
+        sys.exit("Person not found.")
+    target = person_for_name(graph, input("Name: "))
+    if target is None:
+        sys.exit("Person not found.")
+
+    if landmarks:
+        lower, upper = oracle.distance_bounds(source, target)
+        if years is None:
+            print(f"Estimated degrees of separation: {lower} to {upper}")
+        else:
+            # Filtering out movies can only lengthen paths, so only the
+            # lower bound still holds
+            print(f"Estimated degrees of separation: at least {lower}")
+        path = oracle.shortest_path(source, target, years)
+    else:
+        path = graph.shortest_path(source, target, years)
+
+    if path is None:
+        print("Not connected.")
+    else:
+        degrees = len(path)
+        print(f"{degrees} degrees of separation.")
+        path = [(None, source)] + path
+        for i in range(degrees):
+            person1 = graph.person_names[path[i][1]]
+            person2 = graph.person_names[path[i + 1][1]]
+            movie = graph.movie_titles[path[i + 1][0]]
+            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+
+
+def print_component_stats(stats):
+    print(f"{stats['people']} people in {stats['components']} components")
+    print(f"Largest component: {stats['largest']} people")
+    print(f"Isolated people: {stats['singletons']}")
+    for bucket, count in stats["histogram"].items():
+        print(f" {bucket}-{2 * bucket - 1} people: {count} components")
+
+
+def shortest_path(source, target, frontier_class=HashQueueFrontier, years=None):
+    global num_explored
+    num_explored = 0
+    if not components.connected(source, target):
+        return None
+
     start = Node(state=source, parent=None, action=None)
-    frontier = deque([start])
+    frontier = frontier_class()
+    frontier.add(start)
     explored = set()
 
-    while frontier:
-        node = frontier.popleft()
+    while not frontier.empty():
+        node = frontier.remove()
+        num_explored += 1
 
         if node.state == target:
             path = []
@@ -91,36 +367,191 @@ def shortest_path(source, target):
 
         explored.add(node.state)
 
-        for action, state in neighbors_for_person(node.state):
-            if state not in explored and not any(n.state == state for n in frontier):
+        for action, state in neighbors_for_person(node.state, years):
+            if state not in explored and not frontier.contains_state(state):
                 child = Node(state=state, parent=node, action=action)
-                frontier.append(child)
+                frontier.add(child)
+
+    return None
+
+
+def shortest_paths(source, targets=None, years=None):
+    """
+    Runs one BFS from source and returns {person_id: path} for every target
+    reached, or for every reachable person when targets is None. Paths use
+    the `shortest_path` format and the search stops once all reachable
+    targets are found. `years` limits the search to movies released in an
+    inclusive (start, end) range.
+    """
+    global num_explored
+    num_explored = 0
+
+    if targets is None:
+        remaining = None
+    else:
+        remaining = {t for t in targets if components.connected(source, t)}
+        remaining.discard(source)
+
+    # Maps person_id -> (movie_id, parent person_id), shared by every path.
+    # It doubles as the visited set, so the frontier is a plain queue of
+    # person_ids rather than Nodes
+    parents = {source: None}
+    frontier = deque([source])
+    while frontier and remaining != set():
+        state = frontier.popleft()
+        num_explored += 1
+        for movie_id, person_id in neighbors_for_person(state, years):
+            if person_id not in parents:
+                parents[person_id] = (movie_id, state)
+                frontier.append(person_id)
+                if remaining is not None:
+                    remaining.discard(person_id)
+
+    if targets is None:
+        targets = parents
+    paths = {}
+    for target in targets:
+        if target in parents:
+            path = []
+            person_id = target
+            while parents[person_id] is not None:
+                movie_id, previous = parents[person_id]
+                path.append((movie_id, person_id))
+                person_id = previous
+            path.reverse()
+            paths[target] = path
+    return paths
+
+
+def bidirectional_shortest_path(source, target, years=None):
+    """
+    Same result format as `shortest_path`, but grows one BFS layer at a time
+    from whichever side has the smaller frontier and stops once they meet.
+    """
+    global num_explored
+    num_explored = 0
+
+    if source == target:
+        return []
+    if not components.connected(source, target):
+        return None
+
+    # Maps person_id -> (movie_id, person_id one step closer to that side's root)
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = _expand_layer(forward_frontier, forward, backward, years)
+        else:
+            backward_frontier, meeting = _expand_layer(backward_frontier, backward, forward, years)
+
+        if meeting is not None:
+            return _join_paths(meeting, forward, backward)
 
     return None
 
 
+def _expand_layer(frontier, parents, other_parents, years):
+    global num_explored
+
+    # Every meeting found in one layer closes a path of the same length on
+    # this side, so finish the layer and keep the shortest total
+    next_frontier = []
+    meeting = None
+    best = None
+    for person_id in frontier:
+        num_explored += 1
+        for movie_id, neighbor_id in neighbors_for_person(person_id, years):
+            if neighbor_id in parents:
+                continue
+            parents[neighbor_id] = (movie_id, person_id)
+            next_frontier.append(neighbor_id)
+            if neighbor_id in other_parents:
+                length = _depth(neighbor_id, other_parents)
+                if best is None or length < best:
+                    best = length
+                    meeting = neighbor_id
+    return next_frontier, meeting
+
+
+def _depth(person_id, parents):
+    depth = 0
+    while parents[person_id] is not None:
+        person_id = parents[person_id][1]
+        depth += 1
+    return depth
+
+
+def _join_paths(meeting, forward, backward):
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, previous = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = previous
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, following = backward[person_id]
+        path.append((movie_id, following))
+        person_id = following
+    return path
+
+
 def person_id_for_name(name):
+    def describe(person_id):
+        return f"{people[person_id]['name']} (born {people[person_id]['birth']})"
+
     person_ids = list(names.get(name.lower(), set()))
-    if len(person_ids) == 0:
-        return None
+    if len(person_ids) == 1:
+        return person_ids[0]
     elif len(person_ids) > 1:
-        print(f"Which '{name}'?")
-        for i, person_id in enumerate(person_ids):
-            person = people[person_id]
-            print(f" {i + 1}. {person['name']} (born {person['birth']})")
-        try:
-            index = int(input("Intended Person: ")) - 1
-            if 0 <= index < len(person_ids):
-                return person_ids[index]
-        except ValueError:
-            pass
+        return choose_person(f"Which '{name}'?", person_ids, describe)
+
+    suggestions = name_index.suggest(name, k=5)
+    if len(suggestions) == 0:
         return None
-    else:
-        return person_ids[0]
+    return choose_person(f"No exact match for '{name}'. Did you mean:", suggestions, describe)
 
 
-def neighbors_for_person(person_id):
-    movie_ids = people[person_id]["movies"]
+def person_for_name(graph, name):
+    def describe(p):
+        return f"{graph.person_names[p]} (born {graph.person_births[p]})"
+
+    candidates = graph.people_for_name(name)
+    if len(candidates) == 1:
+        return candidates[0]
+    elif len(candidates) > 1:
+        return choose_person(f"Which '{name}'?", candidates, describe)
+
+    suggestions = graph.name_index.suggest(name, k=5)
+    if len(suggestions) == 0:
+        return None
+    return choose_person(f"No exact match for '{name}'. Did you mean:", suggestions, describe)
+
+
+def choose_person(question, candidates, describe):
+    print(question)
+    for i, candidate in enumerate(candidates):
+        print(f" {i + 1}. {describe(candidate)}")
+    try:
+        index = int(input("Intended Person: ")) - 1
+        if 0 <= index < len(candidates):
+            return candidates[index]
+    except (ValueError, EOFError):
+        pass
+    return None
+
+
+def neighbors_for_person(person_id, years=None):
+    if years is None:
+        movie_ids = people[person_id]["movies"]
+    else:
+        movie_ids = movies_in_years(person_id, years)
     neighbors = set()
     for movie_id in movie_ids:
         for person_id in movies[movie_id]["stars"]:
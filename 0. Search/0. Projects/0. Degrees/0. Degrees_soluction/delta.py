@@ -0,0 +1,77 @@
+import json
+import os
+import zlib
+
+# Append-only log of changes replayed on top of the CSVs by every loader
+FILENAME = "delta.jsonl"
+
+# Each change is a JSON object with "op" set to one of these and the fields
+# listed after it
+OPERATIONS = {
+    "add_person": ("id", "name", "birth"),
+    "remove_person": ("id",),
+    "add_movie": ("id", "title", "year"),
+    "remove_movie": ("id",),
+    "add_star": ("person_id", "movie_id"),
+    "remove_star": ("person_id", "movie_id"),
+}
+OPTIONAL = {"birth", "year"}
+
+
+def validate(change):
+    fields = OPERATIONS.get(change.get("op"))
+    if fields is None:
+        raise ValueError(f"unknown delta operation: {change.get('op')}")
+    for field in fields:
+        if field not in change:
+            if field not in OPTIONAL:
+                raise ValueError(f"{change['op']} needs {field}")
+            change[field] = ""
+        change[field] = str(change[field])
+    return change
+
+
+def read_delta(directory, start=0, end=None):
+    """
+    Yields the logged changes for `directory` in the order they were made,
+    only those between byte offsets `start` and `end` if given.
+    """
+    path = os.path.join(directory, FILENAME)
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read() if end is None else f.read(end - start)
+    for line in data.decode("utf-8").splitlines():
+        if line.strip():
+            yield validate(json.loads(line))
+
+
+def log_size(directory):
+    """Bytes in the log, 0 when there is none."""
+    path = os.path.join(directory, FILENAME)
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def log_stamp(directory, length=None):
+    """
+    Returns [length, crc32] of the first `length` bytes of the log (all of
+    it by default), so a reader can tell that a log it replayed up to
+    `length` has only been appended to since.
+    """
+    path = os.path.join(directory, FILENAME)
+    if not os.path.exists(path):
+        return [0, 0]
+    with open(path, "rb") as f:
+        data = f.read() if length is None else f.read(length)
+    return [len(data), zlib.crc32(data)]
+
+
+def append_delta(directory, changes):
+    """Appends changes to the log for `directory` and syncs it to disk."""
+    if not changes:
+        return
+    with open(os.path.join(directory, FILENAME), "a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(change) + "\n" for change in changes))
+        f.flush()
+        os.fsync(f.fileno())
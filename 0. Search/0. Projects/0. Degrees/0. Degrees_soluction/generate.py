@@ -0,0 +1,92 @@
+import argparse
+import csv
+import itertools
+import os
+import random
+
+SYLLABLES = [
+    "al", "an", "ar", "be", "bi", "ca", "da", "de", "el", "en", "fa", "ga", "ha",
+    "is", "ja", "ka", "ke", "la", "le", "li", "ma", "me", "mi", "na", "ne", "ni",
+    "no", "ol", "pa", "ra", "re", "ri", "ro", "sa", "se", "sh", "ta", "te", "ti",
+    "to", "va", "vi", "wi", "ya", "za",
+]
+TITLE_WORDS = [
+    "Night", "River", "Last", "Secret", "City", "Love", "War", "Dark", "House",
+    "Road", "Star", "Blood", "Summer", "Winter", "King", "Queen", "Ghost", "Game",
+    "Dream", "Fire", "Stone", "Silent", "Golden", "Lost", "Wild", "Empire",
+]
+
+
+def person_name(rng):
+    first = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3)))
+    last = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    return f"{first.title()} {last.title()}"
+
+
+def movie_title(rng):
+    return " ".join(rng.choice(TITLE_WORDS) for _ in range(rng.randint(1, 4)))
+
+
+def cast_size(rng, mean):
+    """Log-normal cast sizes: most casts are small, a few are very large."""
+    return max(1, min(200, round(rng.lognormvariate(0, 0.8) * mean / 1.37)))
+
+
+def generate(directory, num_people, num_movies, mean_cast, seed):
+    """
+    Writes people.csv, movies.csv and stars.csv in the Degrees format. People
+    are drawn for casts with Zipf-like weights, so a few appear in hundreds
+    of movies and a long tail appears in one or none, as in the IMDb data.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    person_ids = rng.sample(range(1, num_people * 10), num_people)
+    with open(os.path.join(directory, "people.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for person_id in person_ids:
+            birth = rng.randint(1900, 2010) if rng.random() < 0.8 else ""
+            writer.writerow([person_id, person_name(rng), birth])
+
+    movie_ids = rng.sample(range(1, num_movies * 10), num_movies)
+    with open(os.path.join(directory, "movies.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for movie_id in movie_ids:
+            writer.writerow([movie_id, movie_title(rng), rng.randint(1910, 2024)])
+
+    # Popularity rank r gets weight 1 / (r + 100) ** 0.8
+    cum_weights = list(itertools.accumulate(
+        1 / (rank + 100) ** 0.8 for rank in range(num_people)
+    ))
+    popularity = person_ids[:]
+    rng.shuffle(popularity)
+    credits = 0
+    with open(os.path.join(directory, "stars.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie_id in movie_ids:
+            cast = set(rng.choices(popularity, cum_weights=cum_weights, k=cast_size(rng, mean_cast)))
+            for person_id in cast:
+                writer.writerow([person_id, movie_id])
+            credits += len(cast)
+    return credits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Degrees dataset")
+    parser.add_argument("directory")
+    parser.add_argument("--people", type=int, default=1_000_000)
+    parser.add_argument("--movies", type=int, default=300_000)
+    parser.add_argument("--cast", type=float, default=8, help="mean cast size")
+    parser.add_argument("--seed", type=int, default=50)
+    args = parser.parse_args()
+
+    credits = generate(args.directory, args.people, args.movies, args.cast, args.seed)
+    print(f"Wrote {args.people} people, {args.movies} movies and {credits} credits "
+          f"to {args.directory}")
+
+
+if __name__ == "__main__":
+    main()
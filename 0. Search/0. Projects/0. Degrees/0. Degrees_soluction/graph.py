@@ -0,0 +1,657 @@
+import csv
+from array import array
+from bisect import bisect_left, bisect_right
+
+from delta import read_delta
+from nameindex import NameIndex, build_tree
+from util import DisjointSet, component_stats, parse_year
+
+
+# Low 32 bits of a credit code hold the movie
+MOVIE_MASK = 0xFFFFFFFF
+
+
+class StringTable():
+    """
+    Sequence of strings stored back to back in one UTF-8 blob, with
+    `offsets[i]:offsets[i + 1]` delimiting string i. The blob is never
+    written to: strings appended or replaced later are kept beside it.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+        self.appended = []
+        self.replaced = {}
+
+    @classmethod
+    def from_strings(cls, strings):
+        offsets = array("q", [0])
+        blob = bytearray()
+        for string in strings:
+            blob += string.encode("utf-8")
+            offsets.append(len(blob))
+        return cls(offsets, bytes(blob))
+
+    def __len__(self):
+        return len(self.offsets) - 1 + len(self.appended)
+
+    def __getitem__(self, i):
+        # Called per comparison in binary searches, so len(self) is inlined
+        built = len(self.offsets) - 1
+        if i < 0:
+            i += built + len(self.appended)
+        if self.replaced and i in self.replaced:
+            return self.replaced[i]
+        if 0 <= i < built:
+            return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+        if built <= i < built + len(self.appended):
+            return self.appended[i - built]
+        raise IndexError("string table index out of range")
+
+    def original(self, i):
+        """String i as built, ignoring replacements; for binary searches over the blob."""
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __setitem__(self, i, string):
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        self.replaced[i] = string
+
+    def append(self, string):
+        self.appended.append(string)
+
+
+class CompactGraph():
+    """
+    Degrees dataset with people and movies interned to dense ints.
+
+    Person p starred in movies `person_movies[person_offsets[p]:person_offsets[p + 1]]`
+    and movie m has the cast `movie_people[movie_offsets[m]:movie_offsets[m + 1]]`
+    (compressed sparse row adjacency). The original string IDs, names, births,
+    titles and years are kept in StringTables indexed by the same ints.
+
+    `release_years[m]` is movie m's year as an int (0 when unknown) and each
+    person's movies are sorted by it, so a year range is one contiguous
+    slice of their row found by binary search.
+
+    The arrays may be a read-only snapshot, so changes made after they were
+    built (apply_change) are layered over them: people and movies added
+    since get the next ints, credits added since are kept per person and per
+    movie, and credits removed since are hidden. Like the dict loader's
+    union-find, component labels can be joined by new credits but never
+    split by removals.
+    """
+
+    # Constructor arguments, in order; snapshot.py persists exactly these
+    FIELDS = (
+        "person_ids", "person_names", "person_births",
+        "movie_ids", "movie_titles", "movie_years", "release_years",
+        "person_offsets", "person_movies", "movie_offsets", "movie_people",
+        "person_order", "movie_order",
+        "name_keys", "name_people", "name_counts", "name_tree", "name_positions",
+        "components", "component_sizes",
+    )
+
+    # State apply_change layers over the arrays; batch.py hands it to workers
+    OVERLAY = (
+        "changed", "added_people", "added_movies", "added_years",
+        "added_credits", "added_cast", "hidden_credits", "component_links",
+    )
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years, release_years,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 person_order, movie_order,
+                 name_keys, name_people, name_counts, name_tree, name_positions,
+                 components, component_sizes):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.release_years = release_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        # Person and movie ints sorted by their original ID strings, so an ID
+        # is found by binary search without building a dict of every ID
+        self.person_order = person_order
+        self.movie_order = movie_order
+
+        # Lowercase names sorted for binary search, with the person each
+        # belongs to, their movie counts, a segment tree for ranking and
+        # every person's position in that order (-1 for none)
+        self.name_keys = name_keys
+        self.name_people = name_people
+        self.name_counts = name_counts
+        self.name_tree = name_tree
+        self.name_positions = name_positions
+        self._name_index = None
+
+        # Component label of every person, and the size of every label
+        self.components = components
+        self.component_sizes = component_sizes
+
+        self.num_explored = 0
+
+        self.changed = False
+        self.added_people = 0
+        self.added_movies = 0
+        self.added_years = array("H")
+        self.added_credits = {}
+        self.added_cast = {}
+        self.hidden_credits = set()
+        self.component_links = None
+        self.added_person_ids = {}
+        self.added_movie_ids = {}
+
+    @classmethod
+    def from_csv(cls, directory, delta_end=None):
+        """
+        Streams the three CSV files straight into the compact form and
+        replays the delta log on top, up to byte `delta_end` if given. A
+        removed person or movie keeps its int with an empty id, no credits
+        and no name index entry.
+        """
+        person_index = {}
+        person_ids = []
+        person_names = []
+        person_births = []
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                person_index[row["id"]] = len(person_ids)
+                person_ids.append(row["id"])
+                person_names.append(row["name"])
+                person_births.append(row["birth"])
+
+        movie_index = {}
+        movie_ids = []
+        movie_titles = []
+        movie_years = []
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                movie_index[row["id"]] = len(movie_ids)
+                movie_ids.append(row["id"])
+                movie_titles.append(row["title"])
+                movie_years.append(row["year"])
+
+        # Encode each (person, movie) credit as one int so that sorting groups
+        # credits by person and drops duplicates in a single pass
+        credits = set()
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                try:
+                    credits.add(person_index[row["person_id"]] << 32
+                                | movie_index[row["movie_id"]])
+                except KeyError:
+                    pass
+
+        removed_people = set()
+        removed_movies = set()
+        for change in read_delta(directory, end=delta_end):
+            op = change["op"]
+            if op == "add_person":
+                person_index[change["id"]] = len(person_ids)
+                person_ids.append(change["id"])
+                person_names.append(change["name"])
+                person_births.append(change["birth"])
+            elif op == "remove_person":
+                p = person_index.pop(change["id"])
+                removed_people.add(p)
+                person_ids[p] = ""
+            elif op == "add_movie":
+                movie_index[change["id"]] = len(movie_ids)
+                movie_ids.append(change["id"])
+                movie_titles.append(change["title"])
+                movie_years.append(change["year"])
+            elif op == "remove_movie":
+                m = movie_index.pop(change["id"])
+                removed_movies.add(m)
+                movie_ids[m] = ""
+            elif op == "add_star":
+                credits.add(person_index[change["person_id"]] << 32
+                            | movie_index[change["movie_id"]])
+            elif op == "remove_star":
+                credits.discard(person_index[change["person_id"]] << 32
+                                | movie_index[change["movie_id"]])
+        if removed_people or removed_movies:
+            credits = {
+                code for code in credits
+                if code >> 32 not in removed_people and code & MOVIE_MASK not in removed_movies
+            }
+        del person_index, movie_index
+
+        # Sorting on (person, year, movie) instead of the plain code leaves
+        # every person's row in release order
+        release_years = array("H", (parse_year(year) for year in movie_years))
+        num_movies = len(movie_ids)
+        person_offsets, person_movies, movie_offsets, movie_people = build_adjacency(
+            len(person_ids), num_movies,
+            sorted(credits, key=lambda code: (code >> 32) << 48
+                   | release_years[code & MOVIE_MASK] << 32 | code & MOVIE_MASK)
+        )
+        del credits
+        components, component_sizes = label_components(len(person_ids), movie_offsets, movie_people)
+
+        name_order = sorted(
+            (p for p in range(len(person_names)) if p not in removed_people),
+            key=lambda p: person_names[p].lower()
+        )
+        name_counts = array("i", (
+            person_offsets[p + 1] - person_offsets[p] for p in name_order
+        ))
+        name_positions = array("i", [-1]) * len(person_ids)
+        for i, p in enumerate(name_order):
+            name_positions[p] = i
+        return cls(
+            StringTable.from_strings(person_ids),
+            StringTable.from_strings(person_names),
+            StringTable.from_strings(person_births),
+            StringTable.from_strings(movie_ids),
+            StringTable.from_strings(movie_titles),
+            StringTable.from_strings(movie_years),
+            release_years,
+            person_offsets, person_movies, movie_offsets, movie_people,
+            array("i", sorted(range(len(person_ids)), key=person_ids.__getitem__)),
+            array("i", sorted(range(len(movie_ids)), key=movie_ids.__getitem__)),
+            StringTable.from_strings(person_names[p].lower() for p in name_order),
+            array("i", name_order),
+            name_counts, build_tree(name_counts), name_positions,
+            components, component_sizes,
+        )
+
+    @property
+    def num_people(self):
+        return len(self.person_offsets) - 1 + self.added_people
+
+    @property
+    def num_movies(self):
+        return len(self.movie_offsets) - 1 + self.added_movies
+
+    def person_index(self, person_id):
+        """Maps an original person_id string to its int, or None."""
+        return find_id(person_id, self.person_order, self.person_ids, self.added_person_ids)
+
+    def movie_index(self, movie_id):
+        """Maps an original movie_id string to its int, or None."""
+        return find_id(movie_id, self.movie_order, self.movie_ids, self.added_movie_ids)
+
+    @property
+    def name_index(self):
+        if self._name_index is None:
+            self._name_index = NameIndex(self.name_keys, self.name_people,
+                                         self.name_counts, self.name_tree,
+                                         self.name_positions)
+        return self._name_index
+
+    def component(self, p):
+        """Component label of p; people added since the build start as their own label."""
+        label = self.components[p] if p < len(self.components) else p
+        if self.component_links is not None:
+            label = self.component_links.find(label)
+        return label
+
+    def connected(self, a, b):
+        return self.component(a) == self.component(b)
+
+    def component_stats(self):
+        if not self.changed:
+            return component_stats(self.component_sizes)
+        sizes = {}
+        for label, size in enumerate(self.component_sizes):
+            root = label if self.component_links is None else self.component_links.find(label)
+            sizes[root] = sizes.get(root, 0) + size
+        for p in range(len(self.components), self.num_people):
+            root = self.component(p)
+            sizes[root] = sizes.get(root, 0) + 1
+        return component_stats(sizes.values())
+
+    def people_for_name(self, name):
+        """Returns every person int whose name matches `name`, ignoring case."""
+        return self.name_index.lookup(name)
+
+    def release_year(self, m):
+        if m < len(self.release_years):
+            return self.release_years[m]
+        return self.added_years[m - len(self.release_years)]
+
+    def movies_for_person(self, p, years=None):
+        """Movies p starred in, only those released within `years` (start, end) if given."""
+        if p < len(self.person_offsets) - 1:
+            start = self.person_offsets[p]
+            end = self.person_offsets[p + 1]
+            if years is not None:
+                year = self.release_years.__getitem__
+                first, last = years
+                end = bisect_right(self.person_movies, last, start, end, key=year)
+                start = bisect_left(self.person_movies, first, start, end, key=year)
+            movies = self.person_movies[start:end]
+        else:
+            movies = ()
+        if not self.changed:
+            return movies
+
+        hidden = self.hidden_credits
+        movies = [m for m in movies if p << 32 | m not in hidden]
+        for m in self.added_credits.get(p, ()):
+            if years is None or years[0] <= self.release_year(m) <= years[1]:
+                movies.append(m)
+        return movies
+
+    def people_for_movie(self, m):
+        if m < len(self.movie_offsets) - 1:
+            cast = self.movie_people[self.movie_offsets[m]:self.movie_offsets[m + 1]]
+        else:
+            cast = ()
+        if not self.changed:
+            return cast
+        hidden = self.hidden_credits
+        return [p for p in cast if p << 32 | m not in hidden] + self.added_cast.get(m, [])
+
+    def neighbors(self, p, years=None):
+        """Yields (movie, person) int pairs for everyone who shared a movie with p."""
+        for m in self.movies_for_person(p, years):
+            for q in self.people_for_movie(m):
+                yield m, q
+
+    def shortest_path(self, source, target, years=None):
+        """
+        BFS from source to target over person ints, returning
+        [(movie, person), ...] or None. A movie's whole cast is reached the
+        first time the movie is seen, so each movie is walked at most once.
+        With `years` as an inclusive (start, end) pair only movies released
+        in that range are used.
+        """
+        self.num_explored = 0
+        if source == target:
+            return []
+        if not self.connected(source, target):
+            return None
+
+        parents = {source: None}
+        seen_movies = set()
+        frontier = [source]
+        while frontier:
+            next_frontier = []
+            for p in frontier:
+                self.num_explored += 1
+                for m in self.movies_for_person(p, years):
+                    if m in seen_movies:
+                        continue
+                    seen_movies.add(m)
+                    for q in self.people_for_movie(m):
+                        if q in parents:
+                            continue
+                        parents[q] = (m, p)
+                        if q == target:
+                            return self._path_to(q, parents)
+                        next_frontier.append(q)
+            frontier = next_frontier
+        return None
+
+    def shortest_paths(self, source, targets=None, years=None):
+        """
+        One BFS from source that returns {person: path} for every target it
+        reaches, or for every reachable person when targets is None. Stops
+        as soon as the last reachable target has been found. `years`
+        filters movies as in shortest_path.
+        """
+        self.num_explored = 0
+        if targets is None:
+            remaining = None
+        else:
+            remaining = {t for t in targets if self.connected(source, t)}
+            remaining.discard(source)
+
+        parents = {source: None}
+        seen_movies = set()
+        frontier = [source]
+        while frontier and remaining != set():
+            next_frontier = []
+            for p in frontier:
+                self.num_explored += 1
+                for m in self.movies_for_person(p, years):
+                    if m in seen_movies:
+                        continue
+                    seen_movies.add(m)
+                    for q in self.people_for_movie(m):
+                        if q in parents:
+                            continue
+                        parents[q] = (m, p)
+                        next_frontier.append(q)
+                        if remaining is not None:
+                            remaining.discard(q)
+                if remaining == set():
+                    break
+            frontier = next_frontier
+
+        if targets is None:
+            targets = parents
+        return {t: self._path_to(t, parents) for t in targets if t in parents}
+
+    def _path_to(self, p, parents):
+        path = []
+        while parents[p] is not None:
+            m, previous = parents[p]
+            path.append((m, p))
+            p = previous
+        path.reverse()
+        return path
+
+    def path_ids(self, path):
+        """Converts an int path back to [(movie_id, person_id), ...] strings."""
+        return [(self.movie_ids[m], self.person_ids[p]) for m, p in path]
+
+    def apply_change(self, change):
+        """Applies one delta change (see delta.OPERATIONS) on top of the arrays."""
+        op = change["op"]
+        if op == "add_person":
+            self.add_person(change["id"], change["name"], change["birth"])
+        elif op == "remove_person":
+            self.remove_person(change["id"])
+        elif op == "add_movie":
+            self.add_movie(change["id"], change["title"], change["year"])
+        elif op == "remove_movie":
+            self.remove_movie(change["id"])
+        elif op == "add_star":
+            self.add_star(change["person_id"], change["movie_id"])
+        elif op == "remove_star":
+            self.remove_star(change["person_id"], change["movie_id"])
+
+    def add_person(self, person_id, name, birth=""):
+        if self.person_index(person_id) is not None:
+            raise ValueError(f"person {person_id} already exists")
+        p = self.num_people
+        self.person_ids.append(person_id)
+        self.person_names.append(name)
+        self.person_births.append(birth)
+        self.added_people += 1
+        self.changed = True
+        self.added_person_ids[person_id] = p
+        self.name_index.add(name, p)
+        return p
+
+    def remove_person(self, person_id):
+        p = self._person(person_id)
+        for m in list(self.movies_for_person(p)):
+            self._unlink(p, m)
+        self.person_ids[p] = ""
+        self.added_person_ids.pop(person_id, None)
+        self.name_index.remove(p)
+
+    def add_movie(self, movie_id, title, year=""):
+        if self.movie_index(movie_id) is not None:
+            raise ValueError(f"movie {movie_id} already exists")
+        m = self.num_movies
+        self.movie_ids.append(movie_id)
+        self.movie_titles.append(title)
+        self.movie_years.append(year)
+        self.added_years.append(parse_year(year))
+        self.added_movies += 1
+        self.changed = True
+        self.added_movie_ids[movie_id] = m
+        return m
+
+    def remove_movie(self, movie_id):
+        m = self._movie(movie_id)
+        for p in list(self.people_for_movie(m)):
+            self._unlink(p, m)
+            self._update_count(p)
+        self.movie_ids[m] = ""
+        self.added_movie_ids.pop(movie_id, None)
+
+    def add_star(self, person_id, movie_id):
+        p = self._person(person_id)
+        m = self._movie(movie_id)
+        self.changed = True
+        if m in self.movies_for_person(p):
+            return
+        for q in self.people_for_movie(m):
+            if self.component_links is None:
+                self.component_links = DisjointSet()
+            self.component_links.union(self.component(p), self.component(q))
+            break
+        if p << 32 | m in self.hidden_credits:
+            self.hidden_credits.discard(p << 32 | m)
+        else:
+            self.added_credits.setdefault(p, []).append(m)
+            self.added_cast.setdefault(m, []).append(p)
+        self._update_count(p)
+
+    def remove_star(self, person_id, movie_id):
+        p = self._person(person_id)
+        m = self._movie(movie_id)
+        self.changed = True
+        self._unlink(p, m)
+        self._update_count(p)
+
+    def _person(self, person_id):
+        p = self.person_index(person_id)
+        if p is None:
+            raise KeyError(person_id)
+        return p
+
+    def _movie(self, movie_id):
+        m = self.movie_index(movie_id)
+        if m is None:
+            raise KeyError(movie_id)
+        return m
+
+    def _unlink(self, p, m):
+        """Drops the credit (p, m): forgets it if it was added, hides it if it was built in."""
+        self.changed = True
+        if m in self.added_credits.get(p, ()):
+            self.added_credits[p].remove(m)
+            self.added_cast[m].remove(p)
+        elif p < len(self.person_offsets) - 1 and m in \
+                self.person_movies[self.person_offsets[p]:self.person_offsets[p + 1]]:
+            self.hidden_credits.add(p << 32 | m)
+
+    def _update_count(self, p):
+        index = self.name_index
+        # Snapshot arrays are mapped read-only, so copy them on first write
+        if isinstance(index.counts, memoryview):
+            index.counts = copy_array(index.counts)
+            index.tree = copy_array(index.tree)
+        index.set_count(p, len(self.movies_for_person(p)))
+
+
+def copy_array(view):
+    """Writable array copy of a typed memoryview, in one memcpy."""
+    copy = array(view.format)
+    copy.frombytes(view.cast("B"))
+    return copy
+
+
+def find_id(key, order, ids, added):
+    """
+    Int for an original ID string: one added since the build, or found by
+    binary search over `order`, ints sorted by their built ID. A removed
+    one no longer matches, as its ID now reads as "".
+    """
+    if key in added:
+        return added[key]
+    if not key:
+        return None
+    i = bisect_left(order, key, key=ids.original)
+    if i < len(order) and ids[order[i]] == key:
+        return order[i]
+    return None
+
+
+def build_adjacency(num_people, num_movies, credits):
+    """
+    Builds both CSR directions from sorted, de-duplicated credit codes
+    (person << 32 | movie).
+    """
+    person_offsets = array("i", bytes(4 * (num_people + 1)))
+    person_movies = array("i", bytes(4 * len(credits)))
+    movie_counts = array("i", bytes(4 * (num_movies + 1)))
+    for i, code in enumerate(credits):
+        p = code >> 32
+        m = code & MOVIE_MASK
+        person_offsets[p + 1] += 1
+        person_movies[i] = m
+        movie_counts[m + 1] += 1
+
+    for p in range(num_people):
+        person_offsets[p + 1] += person_offsets[p]
+    for m in range(num_movies):
+        movie_counts[m + 1] += movie_counts[m]
+    movie_offsets = array("i", movie_counts)
+
+    # Counting sort of the same credits by movie; walking people in order
+    # leaves every cast list sorted too
+    movie_people = array("i", bytes(4 * len(credits)))
+    for p in range(num_people):
+        for i in range(person_offsets[p], person_offsets[p + 1]):
+            m = person_movies[i]
+            movie_people[movie_counts[m]] = p
+            movie_counts[m] += 1
+
+    return person_offsets, person_movies, movie_offsets, movie_people
+
+
+def label_components(num_people, movie_offsets, movie_people):
+    """
+    Union-find over every cast list, relabelled so components are numbered
+    0..n-1. Returns (label per person, size per label) arrays.
+    """
+    parent = array("i", range(num_people))
+    size = array("i", [1]) * num_people
+
+    def find(p):
+        while parent[p] != p:
+            parent[p] = parent[parent[p]]
+            p = parent[p]
+        return p
+
+    for m in range(len(movie_offsets) - 1):
+        start = movie_offsets[m]
+        end = movie_offsets[m + 1]
+        if start == end:
+            continue
+        root = find(movie_people[start])
+        for i in range(start + 1, end):
+            other = find(movie_people[i])
+            if other == root:
+                continue
+            if size[root] < size[other]:
+                root, other = other, root
+            parent[other] = root
+            size[root] += size[other]
+
+    labels = {}
+    components = array("i", bytes(4 * num_people))
+    component_sizes = array("i")
+    for p in range(num_people):
+        root = find(p)
+        if root not in labels:
+            labels[root] = len(component_sizes)
+            component_sizes.append(size[root])
+        components[p] = labels[root]
+    return components, component_sizes
@@ -0,0 +1,195 @@
+import heapq
+import math
+import os
+from array import array
+
+from snapshot import delta_stamps, map_sections, source_stamps, write_sections
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 0xFFFF
+FILENAME = "degrees.landmarks"
+
+
+def bfs_distances(graph, source):
+    """Degrees of separation from source to every person, as an array('H')."""
+    distances = array("H", [UNREACHABLE]) * graph.num_people
+    distances[source] = 0
+    seen_movies = set()
+    frontier = [source]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for p in frontier:
+            for m in graph.movies_for_person(p):
+                if m in seen_movies:
+                    continue
+                seen_movies.add(m)
+                for q in graph.people_for_movie(m):
+                    if distances[q] == UNREACHABLE:
+                        distances[q] = depth
+                        next_frontier.append(q)
+        frontier = next_frontier
+    return distances
+
+
+class Landmarks():
+    """
+    Precomputed BFS distances from K landmark people, used for ALT search:
+    by the triangle inequality |d(L, a) - d(L, b)| <= d(a, b) <= d(L, a) + d(L, b)
+    for every landmark L that reaches both a and b.
+    """
+
+    def __init__(self, graph, landmarks, tables):
+        self.graph = graph
+        self.landmarks = landmarks
+        self.tables = tables
+        self.num_explored = 0
+
+    @classmethod
+    def build(cls, graph, k=8):
+        """
+        Picks landmarks by farthest-point selection: start from the person
+        with the most movies, then repeatedly add the person farthest from
+        every landmark chosen so far among those the first one reaches.
+        """
+        if graph.num_people == 0:
+            return cls(graph, [], [])
+        first = max(range(graph.num_people), key=lambda p: len(graph.movies_for_person(p)))
+        landmarks = [first]
+        tables = [bfs_distances(graph, first)]
+        closest = array("H", tables[0])
+
+        while len(landmarks) < k:
+            farthest = None
+            for p in range(graph.num_people):
+                if closest[p] != UNREACHABLE and (farthest is None or closest[p] > closest[farthest]):
+                    farthest = p
+            if farthest is None or closest[farthest] == 0:
+                break
+            landmarks.append(farthest)
+            tables.append(bfs_distances(graph, farthest))
+            for p, distance in enumerate(tables[-1]):
+                if distance < closest[p]:
+                    closest[p] = distance
+        return cls(graph, landmarks, tables)
+
+    def distance_bounds(self, a, b):
+        """
+        Returns (lower, upper) bounds on the degrees between person ints a and
+        b. Both are math.inf when a landmark proves they are not connected;
+        upper is math.inf when no landmark reaches both.
+        """
+        if a == b:
+            return 0, 0
+        lower = 1
+        upper = math.inf
+        for table in self.tables:
+            da = table[a]
+            db = table[b]
+            if (da == UNREACHABLE) != (db == UNREACHABLE):
+                return math.inf, math.inf
+            if da == UNREACHABLE:
+                continue
+            lower = max(lower, abs(da - db))
+            upper = min(upper, da + db)
+        return lower, upper
+
+    def shortest_path(self, source, target, years=None):
+        """
+        A* over person ints with the landmark lower bound as heuristic (ALT).
+        Returns [(movie, person), ...] or None like CompactGraph.shortest_path.
+        Distances in a year-filtered graph are never shorter, so the bounds
+        still hold when `years` restricts the movies used.
+        """
+        self.num_explored = 0
+        if not self.graph.connected(source, target):
+            return None
+
+        # Landmarks that reach the target reach its whole component, which is
+        # all the search can visit, so their distances need no reachability check
+        targets = [(table, table[target]) for table in self.tables
+                   if table[target] != UNREACHABLE]
+
+        def heuristic(p):
+            return max((abs(table[p] - dt) for table, dt in targets), default=0)
+
+        graph = self.graph
+        parents = {source: None}
+        cost = {source: 0}
+        movie_cost = {}
+        closed = set()
+        # Entries are (f, -g, person) so ties on f go to the deepest person
+        frontier = [(heuristic(source), 0, source)]
+        while frontier:
+            f, depth, p = heapq.heappop(frontier)
+            g = -depth
+
+            # Lazy deletion: skip stale entries for already expanded people
+            if p in closed:
+                continue
+            if p == target:
+                return graph._path_to(p, parents)
+            closed.add(p)
+            self.num_explored += 1
+
+            # A movie reached again at no lower cost cannot improve its cast
+            for m in graph.movies_for_person(p, years):
+                if movie_cost.get(m, math.inf) <= g:
+                    continue
+                movie_cost[m] = g
+                for q in graph.people_for_movie(m):
+                    if q in closed or cost.get(q, math.inf) <= g + 1:
+                        continue
+                    cost[q] = g + 1
+                    parents[q] = (m, p)
+
+                    # No frontier entry has f below this one's, so reaching
+                    # the target at cost f is already optimal
+                    if q == target and g + 1 == f:
+                        return graph._path_to(q, parents)
+                    heapq.heappush(frontier, (g + 1 + heuristic(q), -(g + 1), q))
+        return None
+
+    def save(self, path, stamps, k):
+        sections = [(f"table{i}", "H", table) for i, table in enumerate(self.tables)]
+        write_sections(path, {
+            "sources": stamps,
+            "k": k,
+            "num_people": self.graph.num_people,
+            "landmarks": self.landmarks,
+        }, sections)
+
+    @classmethod
+    def load(cls, path, graph, stamps, k):
+        """Maps saved tables, or returns None if they are missing, stale or for another k."""
+        mapped = map_sections(path)
+        if mapped is None:
+            return None
+        header, sections = mapped
+        if (header.get("sources") != stamps or header.get("k") != k
+                or header.get("num_people") != graph.num_people):
+            return None
+        try:
+            landmarks = header["landmarks"]
+            tables = [sections[f"table{i}"] for i in range(len(landmarks))]
+        except (KeyError, TypeError):
+            return None
+        return cls(graph, landmarks, tables)
+
+
+def load_landmarks(directory, graph, k=8):
+    """Returns landmarks for `directory`, building and saving them on first use."""
+    path = os.path.join(directory, FILENAME)
+
+    # Any ingested change can move distances, and stale ones would break the
+    # lower bound, so the tables are rebuilt whenever the delta log grows
+    stamps = source_stamps(directory) + delta_stamps(directory)
+    landmarks = Landmarks.load(path, graph, stamps, k)
+    if landmarks is None:
+        landmarks = Landmarks.build(graph, k)
+        try:
+            landmarks.save(path, stamps, k)
+        except OSError:
+            pass
+    return landmarks
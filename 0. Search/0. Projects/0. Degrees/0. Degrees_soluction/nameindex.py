@@ -0,0 +1,331 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Sorts after any character that appears in a name, closing a prefix range
+PREFIX_END = "\U0010ffff"
+
+# Shorter queries get prefix matches only: one edit away from a two or
+# three letter fragment is most of the index and tells the user nothing
+FUZZY_MIN_LENGTH = 4
+
+
+class NameIndex():
+    """
+    Sorted-array name index for exact, prefix and fuzzy lookups.
+
+    `keys` holds one lowercase name per person in sorted order and
+    `people[i]` is the person whose name is `keys[i]` (a person_id string or
+    a CompactGraph int). `counts[i]` is that person's movie count, and `tree`
+    is a max segment tree over positions, so the k most prolific people in
+    any prefix range are found without scanning the range.
+
+    People added after the index was built go into a small sorted overlay
+    and removed ones are tombstoned, so updates never rebuild the arrays.
+    """
+
+    def __init__(self, keys, people, counts, tree=None, positions=None):
+        self.keys = keys
+        self.people = people
+        self.counts = counts
+        self.tree = tree if tree is not None else build_tree(counts)
+
+        # positions[person] is the person's index in keys, or -1, when
+        # people are ints; otherwise a dict is built on first use
+        self.positions = positions
+
+        self.removed = set()
+        self.added_keys = []
+        self.added_people = []
+        self.added_counts = {}
+        self._positions = None
+
+    @classmethod
+    def build(cls, names, movie_counts):
+        """Builds an index from (name, person) pairs and a person -> movie count map."""
+        entries = sorted((name.lower(), person) for name, person in names)
+        return cls(
+            [name for name, _ in entries],
+            [person for _, person in entries],
+            array("i", (movie_counts[person] for _, person in entries)),
+        )
+
+    def add(self, name, person, count=0):
+        key = name.lower()
+        i = bisect_right(self.added_keys, key)
+        self.added_keys.insert(i, key)
+        self.added_people.insert(i, person)
+        self.added_counts[person] = count
+
+    def remove(self, person):
+        if person in self.added_counts:
+            i = self.added_people.index(person)
+            del self.added_keys[i]
+            del self.added_people[i]
+            del self.added_counts[person]
+            return
+        position = self._position(person)
+        if position is not None:
+            self.removed.add(position)
+
+    def set_count(self, person, count):
+        """Updates a person's movie count, repairing the segment tree above it."""
+        if person in self.added_counts:
+            self.added_counts[person] = count
+            return
+        position = self._position(person)
+        if position is None or position in self.removed:
+            return
+        self.counts[position] = count
+        node = (position + len(self.counts)) // 2
+        while node >= 1:
+            left = self.tree[2 * node]
+            right = self.tree[2 * node + 1]
+            self.tree[node] = right if self.counts[right] > self.counts[left] else left
+            node //= 2
+
+    def _position(self, person):
+        if self.positions is not None:
+            if 0 <= person < len(self.positions) and self.positions[person] >= 0:
+                return self.positions[person]
+            return None
+        if self._positions is None:
+            self._positions = {person: i for i, person in enumerate(self.people)}
+        return self._positions.get(person)
+
+    def lookup(self, name):
+        """Returns every person whose name matches `name`, ignoring case."""
+        key = name.lower()
+        i = bisect_left(self.keys, key)
+        matches = []
+        while i < len(self.keys) and self.keys[i] == key:
+            if i not in self.removed:
+                matches.append(self.people[i])
+            i += 1
+        i = bisect_left(self.added_keys, key)
+        while i < len(self.added_keys) and self.added_keys[i] == key:
+            matches.append(self.added_people[i])
+            i += 1
+        return matches
+
+    def prefix(self, prefix, k=10):
+        """Returns up to k people whose names start with `prefix`, most movies first."""
+        prefix = prefix.lower()
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + PREFIX_END, start)
+        ranked = []
+        for i in self.top_positions(start, end):
+            if len(ranked) == k:
+                break
+            if i not in self.removed:
+                ranked.append((-self.counts[i], self.people[i]))
+
+        start = bisect_left(self.added_keys, prefix)
+        end = bisect_left(self.added_keys, prefix + PREFIX_END, start)
+        for person in self.added_people[start:end]:
+            ranked.append((-self.added_counts[person], person))
+        ranked.sort(key=lambda entry: entry[0])
+        return [person for _, person in ranked[:k]]
+
+    def top_positions(self, start, end):
+        """Yields positions in [start, end) from the largest count down."""
+        ranges = []
+        if start < end:
+            best = self.range_max(start, end)
+            ranges.append((-self.counts[best], best, start, end))
+        while ranges:
+            _, best, start, end = heapq.heappop(ranges)
+            yield best
+            for lo, hi in ((start, best), (best + 1, end)):
+                if lo < hi:
+                    i = self.range_max(lo, hi)
+                    heapq.heappush(ranges, (-self.counts[i], i, lo, hi))
+
+    def range_max(self, start, end):
+        """Position of the largest count in [start, end), leftmost on ties."""
+        n = len(self.counts)
+        best = None
+        start += n
+        end += n
+        while start < end:
+            if start & 1:
+                best = self._better(best, self.tree[start])
+                start += 1
+            if end & 1:
+                end -= 1
+                best = self._better(best, self.tree[end])
+            start >>= 1
+            end >>= 1
+        return best
+
+    def _better(self, a, b):
+        if a is None:
+            return b
+        if self.counts[b] > self.counts[a] or (self.counts[b] == self.counts[a] and b < a):
+            return b
+        return a
+
+    def fuzzy(self, name, max_distance=1, k=10):
+        """
+        Returns up to k (person, distance) pairs whose names are within
+        `max_distance` edits of `name`, closest first and then by movie count.
+        """
+        query = name.lower()
+        matches = []
+        for distance, i in fuzzy_positions(self.keys, query, max_distance):
+            if i not in self.removed:
+                matches.append((distance, -self.counts[i], self.people[i]))
+        for distance, i in fuzzy_positions(self.added_keys, query, max_distance):
+            person = self.added_people[i]
+            matches.append((distance, -self.added_counts[person], person))
+        matches.sort(key=lambda match: match[:2])
+        return [(person, distance) for distance, _, person in matches[:k]]
+
+    def fuzzy_prefix(self, prefix, max_distance=1, k=10):
+        """
+        Returns up to k people whose names start within `max_distance` edits
+        of `prefix`, most movies first. Each run of keys under a matching
+        prefix is ranked with the segment tree, so the cost follows the few
+        trie nodes near the query, not the number of names that match.
+        """
+        prefix = prefix.lower()
+        streams = []
+        for _, start, end in fuzzy_ranges(self.keys, prefix, max_distance, prefixes=True):
+            positions = self.top_positions(start, end)
+            i = next(positions)
+            streams.append((-self.counts[i], i, positions))
+        heapq.heapify(streams)
+        ranked = []
+        while streams and len(ranked) < k:
+            count, i, positions = streams[0]
+            if i not in self.removed:
+                ranked.append((count, self.people[i]))
+            i = next(positions, None)
+            if i is None:
+                heapq.heappop(streams)
+            else:
+                heapq.heapreplace(streams, (-self.counts[i], i, positions))
+
+        for _, start, end in fuzzy_ranges(self.added_keys, prefix, max_distance, prefixes=True):
+            for person in self.added_people[start:end]:
+                ranked.append((-self.added_counts[person], person))
+        ranked.sort(key=lambda entry: entry[0])
+        return [person for _, person in ranked[:k]]
+
+    def suggest(self, name, k=10, max_distance=1):
+        """
+        Prefix matches, or when there are none, names starting within
+        `max_distance` edits of `name`. A fragment some name starts with is
+        taken as typed correctly, so the fuzzy walk, which costs milliseconds
+        on a large index, only runs after a typo, and only for queries of at
+        least FUZZY_MIN_LENGTH characters.
+        """
+        people = self.prefix(name, k)
+        if people or len(name) < FUZZY_MIN_LENGTH:
+            return people
+        return self.fuzzy_prefix(name, max_distance, k)
+
+
+def build_tree(counts):
+    """
+    Iterative max segment tree: leaves tree[n:2n] are positions 0..n-1 and
+    tree[i] holds the position of the largest count under node i.
+    """
+    n = len(counts)
+    tree = array("i", bytes(4 * 2 * n))
+    for i in range(n):
+        tree[n + i] = i
+    for i in range(n - 1, 0, -1):
+        left = tree[2 * i]
+        right = tree[2 * i + 1]
+        tree[i] = right if counts[right] > counts[left] else left
+    return tree
+
+
+def fuzzy_positions(keys, query, max_distance):
+    """
+    Yields (distance, position) for every sorted key within `max_distance`
+    edits of `query`.
+    """
+    for distance, start, _ in fuzzy_ranges(keys, query, max_distance):
+        yield distance, start
+
+
+def fuzzy_ranges(keys, query, max_distance, prefixes=False):
+    """
+    Yields (distance, start, end) for runs of sorted keys within
+    `max_distance` edits of `query`: single keys, or with `prefixes` every
+    key under the shortest prefix within the bound, as one range.
+
+    Walks the keys as an implicit trie: consecutive keys share edit-distance
+    rows for their common prefix, and once every entry in a row exceeds the
+    bound, all keys with that prefix are skipped by binary search.
+    """
+    # Cells further than max_distance from the diagonal can never come
+    # back under the bound, so only that band is computed and everything
+    # else is capped at max_distance + 1
+    cap = max_distance + 1
+    rows = [[min(j, cap) for j in range(len(query) + 1)]]
+    if prefixes and rows[0][-1] <= max_distance:
+        if keys:
+            yield rows[0][-1], 0, len(keys)
+        return
+    previous = ""
+    i = 0
+    while i < len(keys):
+        key = keys[i]
+        common = 0
+        limit = min(len(key), len(previous), len(rows) - 1)
+        while common < limit and key[common] == previous[common]:
+            common += 1
+        del rows[common + 1:]
+
+        end = None
+        for depth in range(common, len(key)):
+            above = rows[depth]
+            char = key[depth]
+            row = [cap] * (len(query) + 1)
+            row[0] = min(depth + 1, cap)
+            best = row[0]
+            for j in range(max(1, depth + 1 - max_distance),
+                           min(len(query), depth + 1 + max_distance) + 1):
+                cost = above[j - 1] + (query[j - 1] != char)
+                if above[j] + 1 < cost:
+                    cost = above[j] + 1
+                if row[j - 1] + 1 < cost:
+                    cost = row[j - 1] + 1
+                if cost > cap:
+                    cost = cap
+                row[j] = cost
+                if cost < best:
+                    best = cost
+            rows.append(row)
+            if best > max_distance or prefixes and row[-1] <= max_distance:
+                end = gallop(keys, key[:depth + 1] + PREFIX_END, i + 1)
+                if best <= max_distance:
+                    yield row[-1], i, end
+                break
+
+        if end is not None:
+            previous = key[:len(rows) - 1]
+            i = end
+            continue
+        if not prefixes and rows[len(key)][-1] <= max_distance:
+            yield rows[len(key)][-1], i, i + 1
+        previous = key
+        i += 1
+
+
+def gallop(keys, key, lo):
+    """
+    bisect_left(keys, key, lo) by exponential search from lo, so the
+    comparisons grow with the distance to the answer, not with len(keys).
+    """
+    n = len(keys)
+    step = 1
+    hi = lo
+    while hi < n and keys[hi] < key:
+        lo = hi + 1
+        hi += step
+        step *= 2
+    return bisect_left(keys, key, lo, min(hi, n))
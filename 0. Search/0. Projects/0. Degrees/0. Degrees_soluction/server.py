@@ -0,0 +1,244 @@
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+
+from snapshot import load_graph
+from util import year_range
+
+
+class QueryServer():
+    """
+    Answers shortest-path queries against one graph loaded up front.
+
+    A query is a JSON object with "source" and "target" names (or
+    "source_id"/"target_id" person IDs to skip name resolution) and an
+    optional "id" echoed back in the reply. A "targets" list of names
+    instead of "target" answers every target from a single search, and a
+    "complete" string returns typeahead suggestions for a partial name.
+    A "years" range such as "1950-1979" only uses movies released in it.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.queries = 0
+
+    def resolve(self, query, side):
+        if f"{side}_id" in query:
+            person_id = query[f"{side}_id"]
+            if isinstance(person_id, bool) or not isinstance(person_id, (str, int)):
+                raise ValueError(f"{side}_id must be a string or an integer")
+            p = self.graph.person_index(str(person_id))
+            if p is None:
+                raise LookupError(f"unknown {side}_id {query[f'{side}_id']}")
+            return p
+
+        name = query.get(side)
+        if name is None:
+            raise LookupError(f"missing {side}")
+        if not isinstance(name, str):
+            raise ValueError(f"{side} must be a string")
+        candidates = self.graph.people_for_name(name)
+        if len(candidates) == 0:
+            raise LookupError(f"person not found: {name}")
+        elif len(candidates) > 1:
+            options = ", ".join(
+                f"{self.graph.person_ids[p]} (born {self.graph.person_births[p]})"
+                for p in candidates
+            )
+            raise LookupError(f"ambiguous name {name}, pass {side}_id: {options}")
+        return candidates[0]
+
+    def answer(self, query):
+        self.queries += 1
+        reply = {"id": query.get("id")} if "id" in query else {}
+        try:
+            if "complete" in query:
+                return self.answer_complete(reply, query["complete"], query.get("limit", 10))
+            years = year_range(str(query["years"])) if "years" in query else None
+            source = self.resolve(query, "source")
+            if "targets" in query:
+                return self.answer_targets(reply, source, query["targets"], years)
+            target = self.resolve(query, "target")
+        except (LookupError, ValueError) as error:
+            reply["error"] = str(error)
+            return reply
+
+        reply["source"] = self.graph.person_names[source]
+        reply["target"] = self.graph.person_names[target]
+        reply.update(self.describe(self.graph.shortest_path(source, target, years)))
+        return reply
+
+    def answer_targets(self, reply, source, names, years=None):
+        if not isinstance(names, list):
+            raise ValueError("targets must be a list of names")
+        targets = []
+        for name in names:
+            try:
+                targets.append(self.resolve({"target": name}, "target"))
+            except (LookupError, ValueError) as error:
+                targets.append(str(error))
+        paths = self.graph.shortest_paths(source, [t for t in targets if isinstance(t, int)],
+                                          years)
+
+        reply["source"] = self.graph.person_names[source]
+        reply["results"] = []
+        for name, target in zip(names, targets):
+            if isinstance(target, str):
+                reply["results"].append({"target": name, "error": target})
+            else:
+                result = {"target": self.graph.person_names[target]}
+                result.update(self.describe(paths.get(target)))
+                reply["results"].append(result)
+        return reply
+
+    def answer_complete(self, reply, text, limit):
+        if not isinstance(text, str):
+            raise ValueError("complete must be a string")
+        if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1:
+            raise ValueError("limit must be a positive integer")
+        reply["completions"] = [
+            {
+                "person_id": self.graph.person_ids[p],
+                "person": self.graph.person_names[p],
+                "birth": self.graph.person_births[p],
+            }
+            for p in self.graph.name_index.suggest(text, k=limit)
+        ]
+        return reply
+
+    def describe(self, path):
+        if path is None:
+            return {"degrees": None, "path": None}
+        return {
+            "degrees": len(path),
+            "path": [
+                {
+                    "movie_id": self.graph.movie_ids[m],
+                    "movie": self.graph.movie_titles[m],
+                    "person_id": self.graph.person_ids[p],
+                    "person": self.graph.person_names[p],
+                }
+                for m, p in path
+            ],
+        }
+
+    def reply(self, query):
+        """
+        Answers a parsed query as a JSON line. Never raises: a query that
+        breaks the search gets an error reply rather than taking the server
+        or its connection down.
+        """
+        try:
+            return json.dumps(self.answer(query))
+        except Exception as error:
+            reply = {"id": query.get("id")} if "id" in query else {}
+            reply["error"] = f"internal error: {error!r}"
+            return json.dumps(reply)
+
+    def answer_line(self, line):
+        try:
+            query = parse_query(line)
+        except ValueError as error:
+            return json.dumps({"error": f"bad request: {error}"})
+        return self.reply(query)
+
+    async def handle_connection(self, reader, writer):
+        while line := await reader.readline():
+            if line.strip():
+                # Searches run in a worker thread so one long query does
+                # not stall the other connections
+                answer = await asyncio.to_thread(self.answer_line, line)
+                writer.write(answer.encode("utf-8") + b"\n")
+                await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    async def serve_stdin(self):
+        while line := await asyncio.to_thread(sys.stdin.readline):
+            if line.strip():
+                print(self.answer_line(line), flush=True)
+
+
+def parse_query(line):
+    query = json.loads(line)
+    if not isinstance(query, dict):
+        raise ValueError("query must be a JSON object")
+    return query
+
+
+def read_batch(filename):
+    """
+    Yields (query, error) for each line of a file of JSON objects or
+    `source,target` CSV rows: the query dict, or None and the reason the
+    line is not a query, so one bad row does not end the batch.
+    """
+    with open(filename, encoding="utf-8") as f:
+        for row in f:
+            if not row.strip():
+                continue
+            try:
+                if row.lstrip().startswith(("{", "[")):
+                    yield parse_query(row), None
+                    continue
+                fields = next(csv.reader([row]))
+                if len(fields) != 2:
+                    raise ValueError("expected a JSON object or a source,target row")
+            except (ValueError, csv.Error) as error:
+                yield None, f"bad request: {error}"
+                continue
+            yield {"source": fields[0].strip(), "target": fields[1].strip()}, None
+
+
+def run_batch(server, filename):
+    start = time.perf_counter()
+    for query, error in read_batch(filename):
+        print(json.dumps({"error": error}) if error else server.reply(query), flush=True)
+    elapsed = time.perf_counter() - start
+    print(f"Answered {server.queries} queries in {elapsed:.2f}s", file=sys.stderr)
+
+
+async def serve(server, args):
+    if args.socket:
+        listener = await asyncio.start_unix_server(server.handle_connection, path=args.socket)
+        print(f"Listening on {args.socket}", file=sys.stderr)
+    elif args.port:
+        listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", args.port)
+        print(f"Listening on 127.0.0.1:{args.port}", file=sys.stderr)
+    else:
+        await server.serve_stdin()
+        return
+
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve Degrees queries as JSON lines")
+    parser.add_argument("directory", nargs="?", default="large")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--socket", help="listen on this Unix socket path")
+    group.add_argument("--port", type=int, help="listen on this localhost TCP port")
+    group.add_argument("--batch", help="answer every query in this file and exit")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="parse the CSVs instead of using a snapshot")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    graph = load_graph(args.directory, cache=not args.no_cache)
+    print(f"Loaded {args.directory} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    server = QueryServer(graph)
+
+    if args.batch:
+        run_batch(server, args.batch)
+        return
+    try:
+        asyncio.run(serve(server, args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
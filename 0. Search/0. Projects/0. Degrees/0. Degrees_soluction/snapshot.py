@@ -0,0 +1,181 @@
+import json
+import mmap
+import os
+import sys
+
+import delta
+from graph import CompactGraph, StringTable
+
+MAGIC = b"DEGSNAP1"
+VERSION = 6
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+FILENAME = "degrees.snapshot"
+
+# Bytes of delta log past the snapshot worth replaying at every start; a
+# longer tail is folded into a fresh snapshot once instead
+MAX_TAIL = 1 << 16
+
+
+def source_stamps(directory):
+    """Returns the (file, mtime_ns, size) triples a snapshot must match."""
+    stamps = []
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stamps.append([name, stat.st_mtime_ns, stat.st_size])
+    return stamps
+
+
+def delta_stamps(directory):
+    """The delta log's (file, mtime_ns, size) triple, for caches that must match it too."""
+    if not os.path.exists(os.path.join(directory, delta.FILENAME)):
+        return []
+    stat = os.stat(os.path.join(directory, delta.FILENAME))
+    return [[delta.FILENAME, stat.st_mtime_ns, stat.st_size]]
+
+
+def load_graph(directory, cache=True):
+    """
+    Returns the CompactGraph for `directory`, memory-mapping its snapshot
+    when one exists for the current CSV files and writing one otherwise.
+
+    A snapshot records how much of the delta log it already includes, so
+    changes ingested since are replayed on top of the mapped graph instead
+    of invalidating it. A log that was rewritten rather than appended to,
+    or a tail past MAX_TAIL bytes, forces a rebuild and a new snapshot
+    covering the whole log.
+    """
+    if not cache:
+        return CompactGraph.from_csv(directory)
+
+    path = os.path.join(directory, FILENAME)
+    stamps = source_stamps(directory)
+    mapped = read_snapshot(path, stamps)
+    if mapped is not None:
+        graph, (length, checksum) = mapped
+        if delta.log_size(directory) - length <= MAX_TAIL and \
+                delta.log_stamp(directory, length) == [length, checksum]:
+            for change in delta.read_delta(directory, start=length):
+                graph.apply_change(change)
+            return graph
+
+    replayed = delta.log_stamp(directory)
+    graph = CompactGraph.from_csv(directory, delta_end=replayed[0])
+    try:
+        write_snapshot(graph, path, stamps, replayed)
+    except OSError:
+        pass
+    return graph
+
+
+def write_snapshot(graph, path, stamps, replayed=(0, 0)):
+    sections = []
+    for field in CompactGraph.FIELDS:
+        value = getattr(graph, field)
+        if isinstance(value, StringTable):
+            sections.append((f"{field}.offsets", "q", value.offsets))
+            sections.append((f"{field}.blob", "B", value.blob))
+        else:
+            sections.append((field, value.typecode, value))
+    write_sections(path, {"sources": stamps, "delta": list(replayed)}, sections)
+
+
+def read_snapshot(path, stamps):
+    """
+    Maps a snapshot as (CompactGraph, [length, crc32] of the delta log it
+    includes), or returns None if it is missing or stale.
+    """
+    mapped = map_sections(path)
+    if mapped is None:
+        return None
+    header, sections = mapped
+    if header.get("sources") != stamps:
+        return None
+
+    fields = []
+    try:
+        for field in CompactGraph.FIELDS:
+            if field in sections:
+                fields.append(sections[field])
+            else:
+                fields.append(StringTable(sections[f"{field}.offsets"],
+                                          sections[f"{field}.blob"]))
+        length, checksum = header["delta"]
+    except (KeyError, TypeError, ValueError):
+        return None
+    return CompactGraph(*fields), [length, checksum]
+
+
+def write_sections(path, header, sections):
+    """
+    Writes (name, typecode, buffer) sections as: MAGIC, 8-byte header length,
+    JSON header, then every section at an 8-byte aligned offset named in the
+    header.
+    """
+    layout = {}
+    offset = 0
+    for name, typecode, data in sections:
+        length = memoryview(data).nbytes
+        layout[name] = [typecode, offset, length]
+        offset += _padded(length)
+
+    header = json.dumps(dict(header, version=VERSION, byteorder=sys.byteorder,
+                             sections=layout)).encode("utf-8")
+    start = _padded(len(MAGIC) + 8 + len(header))
+
+    # Write beside the target and rename so readers never map a partial file
+    temporary = f"{path}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            f.write(bytes(start - f.tell()))
+            for name, typecode, data in sections:
+                length = memoryview(data).nbytes
+                f.write(data)
+                f.write(bytes(_padded(length) - length))
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def map_sections(path):
+    """
+    Memory-maps a file written by write_sections and returns its header and a
+    dict of typed memoryviews, or None if it is missing, from another version
+    or damaged, so callers rebuild it like any stale cache.
+    """
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if buffer[:len(MAGIC)] != MAGIC:
+        return None
+    header_length = int.from_bytes(buffer[len(MAGIC):len(MAGIC) + 8], "little")
+    header_start = len(MAGIC) + 8
+    try:
+        header = json.loads(buffer[header_start:header_start + header_length])
+        if header["version"] != VERSION or header["byteorder"] != sys.byteorder:
+            return None
+
+        start = _padded(header_start + header_length)
+        view = memoryview(buffer)
+        sections = {}
+        for name, (typecode, offset, length) in header["sections"].items():
+            if offset < 0 or length < 0 or start + offset + length > len(buffer):
+                return None
+            section = view[start + offset:start + offset + length]
+            sections[name] = section if typecode == "B" else section.cast(typecode)
+    except (ValueError, KeyError, TypeError):
+        return None
+    return header, sections
+
+
+def _padded(length):
+    return (length + 7) // 8 * 8
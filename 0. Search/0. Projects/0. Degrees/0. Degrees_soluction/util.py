@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -34,4 +37,133 @@ class QueueFrontier(StackFrontier):
         else:
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
-            return node
\ No newline at end of file
+            return node
+
+
+class HashStackFrontier():
+    """
+    StackFrontier with O(1) add, remove and contains_state: nodes live in a
+    list used as a stack and their states are mirrored in a set.
+    """
+    def __init__(self):
+        self.frontier = []
+        self.states = set()
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states.add(node.state)
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self.states.discard(node.state)
+            return node
+
+
+class HashQueueFrontier(HashStackFrontier):
+    def __init__(self):
+        self.frontier = deque()
+        self.states = set()
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self.states.discard(node.state)
+            return node
+
+
+class DisjointSet():
+    """
+    Union-find over hashable items with union by size and path halving.
+    Items not yet added are treated as singletons.
+    """
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def add(self, item):
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item):
+        self.add(item)
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a, b):
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size.pop(b)
+        return a
+
+    def connected(self, a, b):
+        return self.find(a) == self.find(b)
+
+    def component_sizes(self):
+        return list(self.size.values())
+
+
+def component_stats(sizes):
+    """Summarizes component sizes: count, largest, singletons and a power-of-two histogram."""
+    sizes = list(sizes)
+    histogram = {}
+    for size in sizes:
+        bucket = 1 << (size.bit_length() - 1)
+        histogram[bucket] = histogram.get(bucket, 0) + 1
+    return {
+        "components": len(sizes),
+        "people": sum(sizes),
+        "largest": max(sizes, default=0),
+        "singletons": histogram.get(1, 0),
+        "histogram": dict(sorted(histogram.items())),
+    }
+
+
+# Bounds of an open-ended year range. Unknown years parse as 0, so they
+# fall outside every range a year filter can ask for
+FIRST_YEAR = 1
+LAST_YEAR = 0xFFFF
+
+
+def parse_year(year):
+    """Release year as an int, or 0 when the CSV leaves it blank or malformed."""
+    year = year.strip()
+    if year.isdigit() and int(year) <= LAST_YEAR:
+        return int(year)
+    return 0
+
+
+def year_range(text):
+    """
+    Parses "1950-1979", "-1979", "1980-" or "1975" into an inclusive
+    (start, end) pair of ints.
+    """
+    start, dash, end = text.partition("-")
+    if not dash:
+        end = start
+    try:
+        start = int(start) if start.strip() else FIRST_YEAR
+        end = int(end) if end.strip() else LAST_YEAR
+    except ValueError:
+        raise ValueError(f"bad year range: {text}") from None
+    if not FIRST_YEAR <= start <= end <= LAST_YEAR:
+        raise ValueError(f"bad year range: {text}")
+    return start, end
@@ -0,0 +1,134 @@
+from errors import InvalidActionError
+
+X = "X"
+O = "O"
+
+# A state is a pair of 9-bit ints (x, o) with bit 3 * i + j set where that
+# player has marked cell (i, j)
+FULL = 0b111111111
+
+LINES = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100,               # diagonals
+)
+
+# WINS[marks] is True when the cells in `marks` complete any line
+WINS = tuple(any(marks & line == line for line in LINES) for marks in range(FULL + 1))
+
+
+def initial_state():
+    return (0, 0)
+
+
+def player(state):
+    x, o = state
+    return O if x.bit_count() > o.bit_count() else X
+
+
+def actions(state):
+    x, o = state
+    free = ~(x | o) & FULL
+    return {divmod(i, 3) for i in range(9) if free >> i & 1}
+
+
+def result(state, action):
+    i, j = action
+    if i not in (0, 1, 2) or j not in (0, 1, 2):
+        raise InvalidActionError(action, to_board(state), 'Invalid board position for action')
+    cell = 1 << (3 * i + j)
+    x, o = state
+    if (x | o) & cell:
+        raise InvalidActionError(action, to_board(state), 'Invalid action on occupaied tile')
+    if player(state) == X:
+        return (x | cell, o)
+    return (x, o | cell)
+
+
+def winner(state):
+    x, o = state
+    if WINS[x]:
+        return X
+    elif WINS[o]:
+        return O
+    return None
+
+
+def terminal(state):
+    x, o = state
+    return WINS[x] or WINS[o] or x | o == FULL
+
+
+def utility(state):
+    x, o = state
+    if WINS[x]:
+        return 1
+    elif WINS[o]:
+        return -1
+    return 0
+
+
+def from_board(board):
+    """Packs a 3x3 list board into an (x, o) state."""
+    x = 0
+    o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (3 * i + j)
+            elif cell == O:
+                o |= 1 << (3 * i + j)
+    return (x, o)
+
+
+def to_board(state):
+    """Unpacks an (x, o) state into a 3x3 list board."""
+    x, o = state
+    return [
+        [X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1 else None for j in range(3)]
+        for i in range(3)
+    ]
+
+
+# The 8 rotations and reflections of the board as (i, j) -> (i, j) maps,
+# starting with the identity
+SYMMETRIES = (
+    lambda i, j: (i, j),
+    lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j),
+    lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j),
+    lambda i, j: (2 - i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (2 - j, 2 - i),
+)
+
+# CELL_MAPS[k][cell] is where symmetry k sends a cell index and MASK_MAPS[k]
+# does the same for all 512 sets of cells at once
+CELL_MAPS = tuple(
+    tuple(3 * i + j for i, j in (symmetry(*divmod(cell, 3)) for cell in range(9)))
+    for symmetry in SYMMETRIES
+)
+MASK_MAPS = tuple(
+    tuple(sum(1 << cells[c] for c in range(9) if marks >> c & 1) for marks in range(FULL + 1))
+    for cells in CELL_MAPS
+)
+
+
+def canonical(state):
+    """
+    Returns (key, k): one int shared by all 8 symmetric variants of the
+    position, and the symmetry k that maps this state onto it.
+    """
+    x, o = state
+    return min((masks[x] << 9 | masks[o], k) for k, masks in enumerate(MASK_MAPS))
+
+
+def to_canonical(action, k):
+    """Maps an action on the state to the matching cell index of its canonical form."""
+    return CELL_MAPS[k][3 * action[0] + action[1]]
+
+
+def from_canonical(cell, k):
+    """Maps a canonical cell index back to an action on the original state."""
+    return divmod(CELL_MAPS[k].index(cell), 3)
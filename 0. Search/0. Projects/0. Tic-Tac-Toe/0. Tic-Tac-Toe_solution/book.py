@@ -0,0 +1,146 @@
+import argparse
+import os
+import sys
+from array import array
+from functools import lru_cache
+
+import bitboard
+
+# Built by `python book.py` next to this file
+FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+# Loaded on first lookup: canonical position key -> best move as a canonical cell
+moves = None
+
+
+def reachable():
+    """Every position reachable from the empty board, as bitboard states, sorted."""
+    seen = set()
+    stack = [bitboard.initial_state()]
+    while stack:
+        state = stack.pop()
+        if state in seen:
+            continue
+        seen.add(state)
+        if not bitboard.terminal(state):
+            stack.extend(bitboard.result(state, action) for action in bitboard.actions(state))
+    return sorted(seen)
+
+
+@lru_cache(maxsize=None)
+def score(state):
+    """
+    Perfect-play score from X's side: 10 - marks on the board for an X win,
+    the negative for an O win and 0 for a draw, so quicker wins and slower
+    losses are preferred among moves of equal value.
+    """
+    if bitboard.terminal(state):
+        return bitboard.utility(state) * (10 - sum(side.bit_count() for side in state))
+    scores = [score(bitboard.result(state, action)) for action in bitboard.actions(state)]
+    return max(scores) if bitboard.player(state) == bitboard.X else min(scores)
+
+
+def best_action(state):
+    """Best move by score, lowest (i, j) first among equals."""
+    pick = max if bitboard.player(state) == bitboard.X else min
+    return pick(sorted(bitboard.actions(state)),
+                key=lambda action: score(bitboard.result(state, action)))
+
+
+def build():
+    """Solves every reachable non-terminal position once; returns {key: canonical cell}."""
+    book = {}
+    for state in reachable():
+        if bitboard.terminal(state):
+            continue
+        key, symmetry = bitboard.canonical(state)
+        if key not in book:
+            book[key] = bitboard.to_canonical(best_action(state), symmetry)
+    return book
+
+
+def save(book, filename=FILENAME):
+    """Writes one little-endian uint32 (key << 4 | cell) per position, sorted by key."""
+    entries = array("I", sorted(key << 4 | cell for key, cell in book.items()))
+    if sys.byteorder != "little":
+        entries.byteswap()
+    with open(filename, "wb") as f:
+        entries.tofile(f)
+
+
+def load(filename=FILENAME):
+    entries = array("I")
+    with open(filename, "rb") as f:
+        entries.frombytes(f.read())
+    if sys.byteorder != "little":
+        entries.byteswap()
+    return {entry >> 4: entry & 0xF for entry in entries}
+
+
+def lookup(state):
+    """Returns the book move for a bitboard state, or None without a book or entry."""
+    global moves
+    if moves is None:
+        try:
+            moves = load()
+        except OSError:
+            moves = {}
+    key, symmetry = bitboard.canonical(state)
+    cell = moves.get(key)
+    if cell is None:
+        return None
+    return bitboard.from_canonical(cell, symmetry)
+
+
+def validate(book):
+    """
+    Checks the book against tictactoe.search: in every reachable
+    non-terminal position the book's move must be legal and lead to a
+    position with the same minimax value. Returns the failures.
+    """
+    # Imported here since tictactoe looks its moves up in this module
+    import tictactoe
+
+    def value(state):
+        if bitboard.terminal(state):
+            return bitboard.utility(state)
+        return tictactoe.search(state)[0]
+
+    failures = []
+    for state in reachable():
+        if bitboard.terminal(state):
+            continue
+        key, symmetry = bitboard.canonical(state)
+        if key not in book:
+            failures.append((state, None))
+            continue
+        action = bitboard.from_canonical(book[key], symmetry)
+        if action not in bitboard.actions(state) or \
+                value(bitboard.result(state, action)) != value(state):
+            failures.append((state, action))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Tic-Tac-Toe perfect-play book")
+    parser.add_argument("--check", action="store_true",
+                        help="validate the existing book instead of rebuilding it")
+    args = parser.parse_args()
+
+    if args.check:
+        book = load()
+    else:
+        book = build()
+        save(book)
+        print(f"Wrote {len(book)} positions to {FILENAME} ({os.path.getsize(FILENAME)} bytes)")
+
+    failures = validate(book)
+    for state, action in failures[:10]:
+        print(f"Bad move {action} in {bitboard.to_board(state)}")
+    if failures:
+        sys.exit(f"{len(failures)} positions failed validation")
+    print(f"All {len(book)} positions validated against search")
+
+
+if __name__ == "__main__":
+    main()
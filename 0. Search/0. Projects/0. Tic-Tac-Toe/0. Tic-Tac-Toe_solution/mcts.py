@@ -0,0 +1,186 @@
+import argparse
+import importlib
+import math
+import random
+import time
+import types
+from multiprocessing import Pool
+
+import mnk
+
+X = "X"
+
+
+class Node():
+    """
+    A position in the search tree. `reward` sums playout results from the
+    side of `mover`, the player whose move led here: 1 a win, 0.5 a draw.
+    """
+    __slots__ = ("state", "parent", "action", "mover", "children", "untried", "visits", "reward")
+
+    def __init__(self, game, state, rng, parent=None, action=None):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.mover = None if parent is None else game.player(parent.state)
+        self.children = []
+        self.untried = [] if game.terminal(state) else list(game.actions(state))
+        rng.shuffle(self.untried)
+        self.visits = 0
+        self.reward = 0.0
+
+
+def grow(game, state, time_limit, playouts, exploration, seed):
+    """
+    Builds a UCT tree from `state` until `time_limit` seconds pass or
+    `playouts` playouts are done, whichever comes first, but always runs
+    at least one playout when `playouts` allows it. Returns
+    ({action: (visits, reward)} for the root's moves, playouts done).
+    """
+    rng = random.Random(seed)
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    root = Node(game, state, rng)
+    done = 0
+    while playouts is None or done < playouts:
+        if done and deadline is not None and time.perf_counter() > deadline:
+            break
+
+        # Selection: follow the best upper confidence bound down to a node
+        # with moves not yet in the tree
+        node = root
+        while not node.untried and node.children:
+            log_visits = math.log(node.visits)
+            node = max(node.children, key=lambda child: child.reward / child.visits
+                       + exploration * math.sqrt(log_visits / child.visits))
+
+        # Expansion: add one of them
+        if node.untried:
+            action = node.untried.pop()
+            node.children.append(Node(game, game.result(node.state, action), rng, node, action))
+            node = node.children[-1]
+
+        # Simulation: random moves to the end of the game
+        current = node.state
+        while not game.terminal(current):
+            current = game.result(current, rng.choice(list(game.actions(current))))
+        utility = game.utility(current)
+
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            node.reward += (1 + utility) / 2 if node.mover == X else (1 - utility) / 2
+            node = node.parent
+        done += 1
+
+    return {child.action: (child.visits, child.reward) for child in root.children}, done
+
+
+def grow_worker(args):
+    """Pool entry point; a game module is sent by name since modules do not pickle."""
+    game, *rest = args
+    if isinstance(game, str):
+        game = importlib.import_module(game)
+    return grow(game, *rest)
+
+
+class MCTS():
+    """
+    Monte Carlo Tree Search (UCT) player for any game with the
+    player / actions / result / terminal / utility API: the tictactoe or
+    bitboard modules, or an mnk.Game.
+
+    Each move is searched for `time_limit` seconds or `playouts` random
+    playouts. With `workers` > 1 the search is root-parallel: every worker
+    process grows its own tree from the position, for the full time or its
+    share of the playouts, and the most visited move over all the trees is
+    played.
+    """
+
+    def __init__(self, game, time_limit=None, playouts=None, workers=1,
+                 exploration=math.sqrt(2), seed=None):
+        if time_limit is None and playouts is None:
+            raise ValueError("MCTS needs a time_limit or a playouts budget")
+        if playouts is not None and playouts < 1:
+            raise ValueError("playouts must be at least 1")
+        if time_limit is not None and time_limit <= 0:
+            raise ValueError("time_limit must be positive")
+        self.game = game
+        self.time_limit = time_limit
+        self.playouts = playouts
+        self.workers = workers
+        self.exploration = exploration
+        self.seed = seed
+        self.stats = {}
+        self.total_playouts = 0
+        self.elapsed = 0.0
+
+    @property
+    def playouts_per_second(self):
+        return self.total_playouts / self.elapsed if self.elapsed else 0.0
+
+    def best_move(self, state):
+        """Returns the most visited move after the search, or None at a terminal state."""
+        if self.game.terminal(state):
+            return None
+        start = time.perf_counter()
+        if self.workers == 1:
+            trees = [grow(self.game, state, self.time_limit, self.playouts,
+                          self.exploration, self.seed)]
+        else:
+            game = self.game.__name__ if isinstance(self.game, types.ModuleType) else self.game
+            jobs = []
+            for i in range(self.workers):
+                share = None
+                if self.playouts is not None:
+                    share = self.playouts // self.workers + (i < self.playouts % self.workers)
+                seed = None if self.seed is None else self.seed + i
+                jobs.append((game, state, self.time_limit, share, self.exploration, seed))
+            with Pool(self.workers) as pool:
+                trees = pool.map(grow_worker, jobs)
+        self.elapsed = time.perf_counter() - start
+
+        self.stats = {}
+        self.total_playouts = 0
+        for children, done in trees:
+            self.total_playouts += done
+            for action, (visits, reward) in children.items():
+                total = self.stats.get(action, (0, 0.0))
+                self.stats[action] = (total[0] + visits, total[1] + reward)
+        return max(self.stats, key=lambda action: self.stats[action][0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCTS self-play on an m x n board, k in a row")
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=3)
+    parser.add_argument("-k", type=int, default=3, help="marks in a row to win")
+    parser.add_argument("--time", type=float, help="seconds per move")
+    parser.add_argument("--playouts", type=int, help="playouts per move")
+    parser.add_argument("--workers", type=int, default=1, help="root-parallel worker processes")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    if args.time is None and args.playouts is None:
+        args.time = 1.0
+
+    game = mnk.Game(args.rows, args.cols, args.k)
+    try:
+        player = MCTS(game, time_limit=args.time, playouts=args.playouts,
+                      workers=args.workers, seed=args.seed)
+    except ValueError as error:
+        parser.error(str(error))
+    state = game.initial_state()
+    while not game.terminal(state):
+        move = player.best_move(state)
+        visits, reward = player.stats[move]
+        print(f"{game.player(state)} plays {move}: {player.total_playouts} playouts, "
+              f"{player.playouts_per_second:.0f}/s, win rate {reward / visits:.2f}")
+        state = game.result(state, move)
+
+    for row in game.to_board(state):
+        print(" ".join(cell or "." for cell in row))
+    winner = game.winner(state)
+    print(f"Game Over: {winner} wins." if winner else "Game Over: Tie.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+import argparse
+import math
+import time
+
+from errors import InvalidActionError
+
+X = "X"
+O = "O"
+
+# Score of a won position before subtracting the plies taken to reach it,
+# so quicker wins and slower losses score better; larger than any evaluate()
+WIN = 10 ** 15
+
+
+class Game():
+    """
+    m x n Tic-Tac-Toe won by k in a row, with the same initial_state /
+    player / actions / result / winner / terminal / utility API as
+    tictactoe.py.
+
+    States are bitboard (x, o) pairs as in bitboard.py, except that cell
+    (i, j) is bit i * (n + 1) + j: the unused bit closing each row stops a
+    line shifted along the board from wrapping into the next row.
+    """
+
+    def __init__(self, m=3, n=3, k=3):
+        if m < 1 or n < 1 or not 1 <= k <= max(m, n):
+            raise ValueError(f"no {k} in a row fits on a {m}x{n} board")
+        self.m = m
+        self.n = n
+        self.k = k
+        self.stride = n + 1
+        self.full = sum(1 << self.cell((i, j)) for i in range(m) for j in range(n))
+
+        # Bit distances to the right, down, down-right and down-left neighbours
+        self.directions = (1, self.stride, self.stride + 1, self.stride - 1)
+
+        # Every k-cell segment of a row, column or diagonal, for evaluate()
+        self.windows = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i = i + (k - 1) * di
+                    end_j = j + (k - 1) * dj
+                    if end_i < m and 0 <= end_j < n:
+                        self.windows.append(sum(
+                            1 << self.cell((i + s * di, j + s * dj)) for s in range(k)
+                        ))
+
+        # Centre cells take part in the most lines, so they are tried first
+        centre = ((m - 1) / 2, (n - 1) / 2)
+        self.order = sorted(
+            ((i, j) for i in range(m) for j in range(n)),
+            key=lambda cell: (abs(cell[0] - centre[0]) + abs(cell[1] - centre[1]), cell)
+        )
+
+    def cell(self, action):
+        return action[0] * self.stride + action[1]
+
+    def initial_state(self):
+        return (0, 0)
+
+    def player(self, state):
+        x, o = state
+        return O if x.bit_count() > o.bit_count() else X
+
+    def actions(self, state):
+        x, o = state
+        taken = x | o
+        return {action for action in self.order if not taken >> self.cell(action) & 1}
+
+    def result(self, state, action):
+        i, j = action
+        if not (0 <= i < self.m and 0 <= j < self.n):
+            raise InvalidActionError(action, state, 'Invalid board position for action')
+        bit = 1 << self.cell(action)
+        x, o = state
+        if (x | o) & bit:
+            raise InvalidActionError(action, state, 'Invalid action on occupaied tile')
+        if self.player(state) == X:
+            return (x | bit, o)
+        return (x, o | bit)
+
+    def has_line(self, marks):
+        """
+        True if `marks` holds k in a row. After s rounds of `run &= run >> d`
+        a bit survives only if the s cells after it in direction d are set.
+        """
+        for d in self.directions:
+            run = marks
+            for _ in range(self.k - 1):
+                run &= run >> d
+                if not run:
+                    break
+            if run:
+                return True
+        return False
+
+    def winner(self, state):
+        x, o = state
+        if self.has_line(x):
+            return X
+        elif self.has_line(o):
+            return O
+        return None
+
+    def terminal(self, state):
+        x, o = state
+        return x | o == self.full or self.winner(state) is not None
+
+    def utility(self, state):
+        winner = self.winner(state)
+        if winner == X:
+            return 1
+        elif winner == O:
+            return -1
+        return 0
+
+    def evaluate(self, state):
+        """
+        Heuristic score from X's side for a position the search stops at:
+        every window still open to one player counts 10 ** (their marks in
+        it) for them, so near-complete lines dominate.
+        """
+        x, o = state
+        score = 0
+        for window in self.windows:
+            if not window & o:
+                score += 10 ** (window & x).bit_count() - 1
+            elif not window & x:
+                score -= 10 ** (window & o).bit_count() - 1
+        return score
+
+    def to_board(self, state):
+        x, o = state
+        return [
+            [X if x >> self.cell((i, j)) & 1 else O if o >> self.cell((i, j)) & 1 else None
+             for j in range(self.n)]
+            for i in range(self.m)
+        ]
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Engine():
+    """
+    Iterative-deepening alpha-beta (negamax) player for a Game.
+
+    Each iteration searches one ply deeper than the last, so a time budget
+    always leaves the best move of the deepest finished iteration. Moves
+    are tried in a fixed order: the best move an earlier iteration found
+    for the position, then killer moves that caused a cutoff at the same
+    ply, then the rest centre first. Positions at the depth limit are
+    scored with Game.evaluate.
+    """
+
+    def __init__(self, game, depth=None, time_limit=None):
+        self.game = game
+        self.depth = depth
+        self.time_limit = time_limit
+        self.killers = {}
+        self.best_moves = {}
+        self.nodes = 0
+        self.completed_depth = 0
+        self.value = None
+        self.deadline = None
+
+    def best_move(self, state):
+        """Returns the best move found within the budget, or None at a terminal state."""
+        if self.game.terminal(state):
+            return None
+        self.deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        self.nodes = 0
+        self.completed_depth = 0
+        self.killers.clear()
+        self.best_moves.clear()
+
+        # The search is exact once it reaches the end of every line
+        remaining = len(self.game.actions(state))
+        max_depth = remaining if self.depth is None else min(self.depth, remaining)
+        move = self.ordered(state, 0)[0]
+        for depth in range(1, max_depth + 1):
+            try:
+                self.value, move = self.search(state, depth, -math.inf, math.inf, 0)
+            except SearchTimeout:
+                break
+            self.completed_depth = depth
+
+            # A forced win or loss cannot change with more depth
+            if abs(self.value) > WIN - self.game.m * self.game.n - 1:
+                break
+        return move
+
+    def search(self, state, depth, alpha, beta, ply):
+        """Negamax: returns (value for the player to move, best action)."""
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % 1024 == 0 \
+                and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        game = self.game
+        sign = 1 if game.player(state) == X else -1
+        if game.terminal(state):
+            return sign * game.utility(state) * (WIN - ply), None
+        if depth == 0:
+            return sign * game.evaluate(state), None
+
+        best = -math.inf
+        best_action = None
+        for action in self.ordered(state, ply):
+            value = -self.search(game.result(state, action), depth - 1, -beta, -alpha, ply + 1)[0]
+            if value > best:
+                best = value
+                best_action = action
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                killers = self.killers.setdefault(ply, [])
+                if action not in killers:
+                    killers.insert(0, action)
+                    del killers[2:]
+                break
+
+        self.best_moves[state] = best_action
+        return best, best_action
+
+    def ordered(self, state, ply):
+        free = self.game.actions(state)
+        moves = [action for action in self.game.order if action in free]
+        first = [self.best_moves.get(state)] + self.killers.get(ply, [])
+        for action in reversed(first):
+            if action in free:
+                moves.remove(action)
+                moves.insert(0, action)
+        return moves
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine self-play on an m x n board, k in a row")
+    parser.add_argument("--rows", type=int, default=4)
+    parser.add_argument("--cols", type=int, default=4)
+    parser.add_argument("-k", type=int, default=4, help="marks in a row to win")
+    parser.add_argument("--depth", type=int, help="maximum search depth")
+    parser.add_argument("--time", type=float, help="seconds per move")
+    args = parser.parse_args()
+    if args.depth is None and args.time is None:
+        args.time = 1.0
+
+    game = Game(args.rows, args.cols, args.k)
+    engine = Engine(game, depth=args.depth, time_limit=args.time)
+    state = game.initial_state()
+    while not game.terminal(state):
+        start = time.perf_counter()
+        move = engine.best_move(state)
+        elapsed = time.perf_counter() - start
+        print(f"{game.player(state)} plays {move}: depth {engine.completed_depth}, "
+              f"{engine.nodes} nodes, {elapsed:.2f}s")
+        state = game.result(state, move)
+
+    for row in game.to_board(state):
+        print(" ".join(cell or "." for cell in row))
+    winner = game.winner(state)
+    print(f"Game Over: {winner} wins." if winner else "Game Over: Tie.")
+
+
+if __name__ == "__main__":
+    main()
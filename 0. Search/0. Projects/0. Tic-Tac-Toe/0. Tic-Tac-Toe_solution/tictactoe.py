@@ -1,6 +1,8 @@
 import random
+
+import bitboard
+import book
 from errors import InvalidActionError
-from copy import deepcopy
 
 X = "X"
 O = "O"
@@ -13,33 +15,26 @@ def initial_state():
             [EMPTY, EMPTY, EMPTY]]
 
 
-def player(board):
-    countX = 0
-    countO = 0
-    countEMPTY = 0
+def state_of(board):
+    """
+    Boards may be 3x3 lists (what runner.py uses) or bitboard (x, o)
+    states; every function below takes either and works on the state.
+    """
+    return board if isinstance(board, tuple) else bitboard.from_board(board)
 
-    for r in board:
-        countX = countX + r.count(X)
-        countO = countO + r.count(O)
-        countEMPTY = countEMPTY + r.count(EMPTY)
 
-    if countX > countO:
-        return O
-    else:
-        return X
+def player(board):
+    return bitboard.player(state_of(board))
 
 
 def actions(board):
-    move = set()
-
-    for i in range(3):
-        for j in range(3):
-            if board[i][j] == EMPTY:
-                move.add((i, j))
-    return move
+    return bitboard.actions(state_of(board))
 
 
 def result(board, action):
+    if isinstance(board, tuple):
+        return bitboard.result(board, action)
+
     i = action[0]
     j = action[1]
 
@@ -48,128 +43,163 @@ def result(board, action):
     elif board[i][j] is not EMPTY:
         raise InvalidActionError(action, board, 'Invalid action on occupaied tile')
 
-    copyBoard = deepcopy(board)
+    copyBoard = [row[:] for row in board]
     copyBoard[i][j] = player(board)
     return copyBoard
 
 
 def winner(board):
+    return bitboard.winner(state_of(board))
 
-    for r in board:
-        if r.count(X) == 3:
-            return X
-        if r.count(O) == 3:
-            return O
 
-    for j in range(3):
-        column = ''
-        for i in range(3):
-            column = column + str(board[i][j])
+def terminal(board):
+    return bitboard.terminal(state_of(board))
 
-        if column == 'XXX':
-            return X
-        elif column == 'OOO':
-            return O
 
-    d1 = ''
-    d2 = ''
-    j = 2
+def utility(board):
+    return bitboard.utility(state_of(board))
 
-    for i in range(3):
-        d1 = d1 + str(board[i][i])
-        d2 = d2 + str(board[i][j])
-        j = j - 1
 
-    if d1 == 'XXX' or d2 == 'XXX':
-        return X
-    elif d1 == 'OOO' or d2 == 'OOO':
-        return O
-    return None
+exploredActions = 0
 
+# Bound types for table entries: the stored value is exact, or the true
+# value is at least / at most it (the search was cut off by beta / alpha)
+EXACT = 0
+LOWER = 1
+UPPER = 2
 
-def terminal(board):
-    if winner(board) or not actions(board):
-        return True
-    else:
-        return False
+# Canonical position key -> (value, bound, best move as a canonical cell).
+# A position's value never changes, so entries stay valid across calls
+transpositions = {}
+tableLookups = 0
+tableHits = 0
 
 
-def utility(board):
-    if winner(board) == 'X':
-        return 1
-    elif winner(board) == 'O':
-        return -1
-    else:
-        return 0
+def clear_table():
+    transpositions.clear()
 
 
-exploredActions = 0
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board: a
+    single opening-book lookup when book.bin has been built, otherwise a
+    search.
+    """
+    board = state_of(board)
+    if terminal(board):
+        return None
+    move = book.lookup(board)
+    if move is not None:
+        return move
 
+    print('AI is working')
+    bMove = search(board)[1]
+    print('AI actions: ', exploredActions)
+    if tableLookups:
+        print(f'Table hits: {tableHits}/{tableLookups} ({tableHits / tableLookups:.0%})')
+    return bMove
 
-def minimax(board):
-    global exploredActions
-    exploredActions = 0
 
-    def max_player(board, bMin=10):
+def search(board):
+    """Alpha-beta search of a non-terminal board: returns (value, best action)."""
+    global exploredActions, tableLookups, tableHits
+    exploredActions = 0
+    tableLookups = 0
+    tableHits = 0
+
+    def probe(board, alpha, beta):
+        """
+        Looks the position up under all 8 symmetries at once. Returns
+        (key, symmetry, cutoff, hint): cutoff is a (value, action) result
+        when the stored bound settles the search, and hint is the stored
+        best move to try first otherwise.
+        """
+        global tableLookups, tableHits
+        tableLookups = tableLookups + 1
+        key, symmetry = bitboard.canonical(board)
+        entry = transpositions.get(key)
+        if entry is None:
+            return key, symmetry, None, None
+
+        value, bound, cell = entry
+        move = bitboard.from_canonical(cell, symmetry)
+        if bound == EXACT or (bound == LOWER and value >= beta) or (bound == UPPER and value <= alpha):
+            tableHits = tableHits + 1
+            return key, symmetry, (value, move), move
+        return key, symmetry, None, move
+
+    def ordered(board, hint):
+        actionList = list(actions(board))
+        random.shuffle(actionList)
+        if hint is not None:
+            actionList.remove(hint)
+            actionList.insert(0, hint)
+        return actionList
+
+    def store(key, symmetry, value, alpha, beta, action):
+        if value <= alpha:
+            bound = UPPER
+        elif value >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        transpositions[key] = (value, bound, bitboard.to_canonical(action, symmetry))
+
+    def max_player(board, alpha=-10, beta=10):
         global exploredActions
 
         if terminal(board):
             return (utility(board), None)
+        key, symmetry, cutoff, hint = probe(board, alpha, beta)
+        if cutoff is not None:
+            return cutoff
 
         value = -10
         bAction = None
-        actionSet = actions(board)
-
-        while len(actionSet) > 0:
-            action = random.choice(tuple(actionSet))
-            actionSet.remove(action)
-
-            if bMin <= value:
-                break
-
+        bestAlpha = alpha
+        for action in ordered(board, hint):
             exploredActions = exploredActions + 1
-            min_player_result = min_player(result(board, action), value)
-            
+            min_player_result = min_player(result(board, action), bestAlpha, beta)
+
             if min_player_result[0] > value:
                 bAction = action
                 value = min_player_result[0]
+            bestAlpha = max(bestAlpha, value)
+            if bestAlpha >= beta:
+                break
+
+        store(key, symmetry, value, alpha, beta, bAction)
         return (value, bAction)
 
-    def min_player(board, bMax=-10):
+    def min_player(board, alpha=-10, beta=10):
         global exploredActions
 
         if terminal(board):
             return (utility(board), None)
+        key, symmetry, cutoff, hint = probe(board, alpha, beta)
+        if cutoff is not None:
+            return cutoff
 
         value = 10
         bAction = None
-        actionSet = actions(board)
-
-        while len(actionSet) > 0:
-            action = random.choice(tuple(actionSet))
-            actionSet.remove(action)
-
-            if bMax >= value:
-                break
-
+        bestBeta = beta
+        for action in ordered(board, hint):
             exploredActions = exploredActions + 1
-            max_player_result = max_player(result(board, action), value)
-        
+            max_player_result = max_player(result(board, action), alpha, bestBeta)
+
             if max_player_result[0] < value:
                 bAction = action
                 value = max_player_result[0]
-        return (value, bAction)
+            bestBeta = min(bestBeta, value)
+            if alpha >= bestBeta:
+                break
 
-    if terminal(board):
-        return None
+        store(key, symmetry, value, alpha, beta, bAction)
+        return (value, bAction)
 
+    # Search on the bitboard so each move and terminal check is a few
+    # bit operations rather than a board copy and rescan
+    board = state_of(board)
     if player(board) == 'X':
-        print('AI is working')
-        bMove = max_player(board)[1]
-        print('AI actions: ', exploredActions)
-        return bMove
-    else:
-        print('AI is working')
-        bMove = min_player(board)[1]
-        print('AI actions: ', exploredActions)
-        return bMove
\ No newline at end of file
+        return max_player(board)
+    return min_player(board)
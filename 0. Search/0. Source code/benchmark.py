@@ -0,0 +1,114 @@
+import argparse
+import os
+import tempfile
+import time
+
+from generate import METHODS, generate, write_maze
+from maze import ALGORITHMS, Maze, StackFrontier, QueueFrontier, HashStackFrontier, HashQueueFrontier
+
+
+def open_maze(size):
+    """Writes a wall-free size x size maze with A and B in opposite corners."""
+    rows = [" " * size for _ in range(size)]
+    rows[0] = "A" + rows[0][1:]
+    rows[-1] = rows[-1][:-1] + "B"
+    fd, filename = tempfile.mkstemp(suffix=".txt")
+    with os.fdopen(fd, "w") as f:
+        f.write("\n".join(rows))
+    return filename
+
+
+def compare_frontiers(filename):
+    maze = Maze(filename)
+    print(f"{maze.height}x{maze.width} maze")
+    print(f"{'frontier':>18} {'explored':>9} {'seconds':>9}")
+    for frontier_class in (StackFrontier, HashStackFrontier, QueueFrontier, HashQueueFrontier):
+        start = time.perf_counter()
+        maze.solve(frontier_class=frontier_class)
+        elapsed = time.perf_counter() - start
+        print(f"{frontier_class.__name__:>18} {maze.num_explored:>9} {elapsed:>9.3f}")
+
+
+def corpus(directory, sizes, seed, density):
+    """Writes one maze per generator and size, each seeded from `seed`. Returns (name, filename) pairs."""
+    mazes = []
+    for size in sizes:
+        for method in METHODS:
+            name = f"{method}-{size}"
+            filename = os.path.join(directory, f"{name}.txt")
+            write_maze(filename, generate(size, size, method, density, f"{seed}-{name}"))
+            mazes.append((name, filename))
+    return mazes
+
+
+def solve(maze, algorithm):
+    """Returns (explored, path length or None, seconds) for one solver run."""
+    start = time.perf_counter()
+    try:
+        maze.solve(algorithm)
+        length = len(maze.solution[0])
+    except Exception as error:
+        if str(error) != "no solution":
+            raise
+        length = None
+    return maze.num_explored, length, time.perf_counter() - start
+
+
+def compare_solvers(sizes, seed, density):
+    """
+    Runs every algorithm in maze.ALGORITHMS on a seeded corpus of generated
+    mazes and tables states explored, path length and time, then totals
+    per algorithm. Wavefront loads the numpy backend, the rest nested lists.
+    """
+    totals = {algorithm: [0, 0.0, 0, 0] for algorithm in ALGORITHMS}
+    print(f"{'maze':>16} {'algorithm':>9} {'explored':>9} {'length':>7} {'seconds':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, filename in corpus(directory, sizes, seed, density):
+            mazes = {"list": Maze(filename), "numpy": Maze(filename, backend="numpy")}
+            results = {
+                algorithm: solve(mazes["numpy" if algorithm == "wavefront" else "list"], algorithm)
+                for algorithm in ALGORITHMS
+            }
+            shortest = results["bfs"][1]
+            for algorithm, (explored, length, elapsed) in results.items():
+                total = totals[algorithm]
+                total[0] += explored
+                total[1] += elapsed
+                total[2] += length == shortest
+                total[3] += 1
+                print(f"{name:>16} {algorithm:>9} {explored:>9} "
+                      f"{'-' if length is None else length:>7} {elapsed:>9.3f}")
+
+    print()
+    print(f"{'algorithm':>9} {'explored':>10} {'seconds':>9} {'shortest':>9}")
+    for algorithm, (explored, elapsed, optimal, runs) in totals.items():
+        print(f"{algorithm:>9} {explored:>10} {elapsed:>9.3f} {optimal:>5}/{runs:<3}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare maze frontier implementations")
+    parser.add_argument("maze", nargs="?", help="maze file (default: generated open grid)")
+    parser.add_argument("--size", type=int, default=60)
+    parser.add_argument("--solvers", action="store_true",
+                        help="table every solver on a generated corpus instead")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[21, 61, 121],
+                        help="corpus maze sizes for --solvers")
+    parser.add_argument("--density", type=float, default=0.3,
+                        help="wall density of the corpus's random-fill mazes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.solvers:
+        compare_solvers(args.sizes, args.seed, args.density)
+    elif args.maze:
+        compare_frontiers(args.maze)
+    else:
+        filename = open_maze(args.size)
+        try:
+            compare_frontiers(filename)
+        finally:
+            os.remove(filename)
+
+
+if __name__ == "__main__":
+    main()
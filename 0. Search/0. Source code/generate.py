@@ -0,0 +1,128 @@
+import argparse
+import random
+
+WALL = ord("#")
+SPACE = ord(" ")
+
+# Maze generators generate() accepts
+METHODS = ("backtracker", "prim", "fill")
+
+
+def backtracker(height, width, rng):
+    """
+    Recursive backtracker (randomized depth-first search) carving passages
+    between rooms at odd coordinates: long, winding corridors with few
+    branches. Returns rows as bytearrays.
+    """
+    grid = [bytearray([WALL]) * width for _ in range(height)]
+    grid[1][1] = SPACE
+    stack = [(1, 1)]
+    while stack:
+        row, col = stack[-1]
+        options = [
+            (row + dr, col + dc)
+            for dr, dc in ((-2, 0), (2, 0), (0, -2), (0, 2))
+            if 0 < row + dr < height - 1 and 0 < col + dc < width - 1
+            and grid[row + dr][col + dc] == WALL
+        ]
+        if not options:
+            stack.pop()
+            continue
+        r, c = rng.choice(options)
+        grid[(row + r) // 2][(col + c) // 2] = SPACE
+        grid[r][c] = SPACE
+        stack.append((r, c))
+    return grid
+
+
+def prim(height, width, rng):
+    """
+    Randomized Prim's algorithm over the same rooms: grows the maze from a
+    random edge on its boundary each step, giving many short dead ends.
+    """
+    grid = [bytearray([WALL]) * width for _ in range(height)]
+
+    def add_edges(row, col):
+        for dr, dc in ((-2, 0), (2, 0), (0, -2), (0, 2)):
+            if 0 < row + dr < height - 1 and 0 < col + dc < width - 1:
+                edges.append((row, col, row + dr, col + dc))
+
+    edges = []
+    grid[1][1] = SPACE
+    add_edges(1, 1)
+    while edges:
+        i = rng.randrange(len(edges))
+        edges[i], edges[-1] = edges[-1], edges[i]
+        row, col, r, c = edges.pop()
+        if grid[r][c] == WALL:
+            grid[(row + r) // 2][(col + c) // 2] = SPACE
+            grid[r][c] = SPACE
+            add_edges(r, c)
+    return grid
+
+
+def fill(height, width, rng, density):
+    """Open floor with each cell a wall with probability `density`; may have no solution."""
+    return [
+        bytearray(WALL if rng.random() < density else SPACE for _ in range(width))
+        for _ in range(height)
+    ]
+
+
+def last_room(size):
+    """Largest odd index short of the outer wall."""
+    return size - 2 if size % 2 else size - 3
+
+
+def generate(height, width, method="backtracker", density=0.3, seed=None):
+    """
+    Returns a maze as a list of text rows with A top left and B bottom
+    right. The room-based methods need at least two rooms, so one side of
+    5 or more, and round even sizes down by leaving the last row or column
+    solid.
+    """
+    if min(height, width) < 3:
+        raise ValueError("maze must be at least 3x3")
+    if method != "fill" and max(height, width) < 5:
+        raise ValueError(f"{method} mazes need a side of at least 5 to fit A and B")
+    rng = random.Random(seed)
+    if method == "backtracker":
+        grid = backtracker(height, width, rng)
+    elif method == "prim":
+        grid = prim(height, width, rng)
+    elif method == "fill":
+        grid = fill(height, width, rng, density)
+    else:
+        raise ValueError(f"unknown method: {method}")
+
+    if method == "fill":
+        grid[0][0] = ord("A")
+        grid[-1][-1] = ord("B")
+    else:
+        grid[1][1] = ord("A")
+        grid[last_room(height)][last_room(width)] = ord("B")
+    return [row.decode("ascii") for row in grid]
+
+
+def write_maze(filename, rows):
+    with open(filename, "w") as f:
+        f.write("\n".join(rows) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a random maze in the maze.py text format")
+    parser.add_argument("filename")
+    parser.add_argument("--height", type=int, default=41)
+    parser.add_argument("--width", type=int, default=41)
+    parser.add_argument("--method", choices=METHODS, default="backtracker")
+    parser.add_argument("--density", type=float, default=0.3,
+                        help="wall probability for --method fill")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    write_maze(args.filename, generate(args.height, args.width, args.method,
+                                       args.density, args.seed))
+
+
+if __name__ == "__main__":
+    main()
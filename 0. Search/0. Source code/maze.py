@@ -1,10 +1,26 @@
+import heapq
+import itertools
+import mmap
+import os
+import re
 import sys
+import time
+from bisect import bisect_right
+from collections import deque
+
+# Search algorithms Maze.solve accepts; wavefront needs numpy
+ALGORITHMS = ("dfs", "bfs", "greedy", "astar", "jps", "idastar", "wavefront")
+
+# Moves as (action, row offset, column offset)
+MOVES = (("up", -1, 0), ("down", 1, 0), ("left", 0, -1), ("right", 0, 1))
+
 
 class Node():
-    def __init__(self, state, parent, action):
+    def __init__(self, state, parent, action, cost=0):
         self.state = state
         self.parent = parent
         self.action = action
+        self.cost = cost
 
 
 class StackFrontier():
@@ -39,9 +55,183 @@ class QueueFrontier(StackFrontier):
             self.frontier = self.frontier[1:]
             return node
 
+
+class HashStackFrontier():
+    """StackFrontier with a set of states for O(1) contains_state."""
+
+    def __init__(self):
+        self.frontier = []
+        self.states = set()
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states.add(node.state)
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.pop()
+            self.states.discard(node.state)
+            return node
+
+
+class HashQueueFrontier(HashStackFrontier):
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = set()
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier.popleft()
+            self.states.discard(node.state)
+            return node
+
+
+class PriorityFrontier():
+    """
+    Binary-heap frontier that removes the node with the lowest priority(node).
+
+    A cheaper path to a state already in the frontier is pushed as a new
+    entry rather than searched for and updated; the old entry is dropped
+    when it reaches the top of the heap (lazy deletion).
+    """
+
+    def __init__(self, priority):
+        self.priority = priority
+        self.frontier = []
+        self.costs = {}
+        self.counter = itertools.count()
+
+    def add(self, node):
+        self.costs[node.state] = node.cost
+        heapq.heappush(self.frontier, (self.priority(node), next(self.counter), node))
+
+    def decrease(self, node):
+        """Re-queues node's state if node reaches it more cheaply than before."""
+        if node.cost < self.costs[node.state]:
+            self.add(node)
+
+    def contains_state(self, state):
+        return state in self.costs
+
+    def empty(self):
+        self.discard_stale()
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            _, _, node = heapq.heappop(self.frontier)
+            del self.costs[node.state]
+            return node
+
+    def discard_stale(self):
+        while self.frontier:
+            node = self.frontier[0][2]
+            if self.costs.get(node.state) == node.cost:
+                break
+            heapq.heappop(self.frontier)
+
+
+class BitWalls():
+    """
+    Wall grid packed one bit per cell, row-major, with each row padded to a
+    whole number of bytes. walls[row][col] reads like the nested lists.
+    """
+
+    def __init__(self, height, width, bits=None):
+        self.height = height
+        self.width = width
+        self.stride = (width + 7) // 8
+        self.bits = bits if bits is not None else bytearray(height * self.stride)
+
+    def is_wall(self, row, col):
+        return self.bits[row * self.stride + (col >> 3)] >> (7 - (col & 7)) & 1
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, row):
+        if not 0 <= row < self.height:
+            raise IndexError("wall row out of range")
+        return BitRow(self, row)
+
+    def __iter__(self):
+        for row in range(self.height):
+            yield BitRow(self, row)
+
+    def __array__(self, dtype=None, copy=None):
+        import numpy as np
+        cells = np.unpackbits(np.frombuffer(self.bits, dtype=np.uint8))
+        cells = cells.reshape(self.height, self.stride * 8)[:, :self.width]
+        return cells.astype(dtype or bool)
+
+
+class BitRow():
+    def __init__(self, walls, row):
+        self.walls = walls
+        self.row = row
+
+    def __len__(self):
+        return self.walls.width
+
+    def __getitem__(self, col):
+        if not 0 <= col < self.walls.width:
+            raise IndexError("wall column out of range")
+        return bool(self.walls.is_wall(self.row, col))
+
+    def __iter__(self):
+        start = self.row * self.walls.stride
+        packed = self.walls.bits[start:start + self.walls.stride]
+        bits = bin(int.from_bytes(packed, "big"))[2:].zfill(len(packed) * 8)
+        return (bit == "1" for bit in bits[:self.walls.width])
+
+
+# Maps each byte of a maze file to "1" for a wall and "0" for open floor
+WALL_DIGITS = bytes(ord("0") if byte in b" AB" else ord("1") for byte in range(256))
+
+
+class CellMask():
+    """Read-only set of (row, col) cells backed by a 2-D boolean array."""
+
+    def __init__(self, mask):
+        self.mask = mask
+
+    def __contains__(self, cell):
+        return bool(self.mask[cell])
+
+    def __len__(self):
+        return int(self.mask.sum())
+
+    def __iter__(self):
+        rows, cols = self.mask.nonzero()
+        return zip(rows.tolist(), cols.tolist())
+
+
 class Maze():
 
-    def __init__(self, filename):
+    def __init__(self, filename, backend="list"):
+        """
+        Loads a maze file. backend="numpy" keeps walls in a 2-D boolean
+        array instead of nested lists, which large mazes need to fit in
+        memory, and backend="bits" streams the file into BitWalls at one
+        bit per cell; every solver works with any of them.
+        """
+        if backend == "bits":
+            self.load_bits(filename)
+            self.solution = None
+            return
 
         # Read file and set height and width of maze
         with open(filename) as f:
@@ -58,6 +248,13 @@ class Maze():
         self.height = len(contents)
         self.width = max(len(line) for line in contents)
 
+        if backend == "numpy":
+            self.load_array(contents)
+            self.solution = None
+            return
+        elif backend != "list":
+            raise ValueError(f"unknown backend: {backend}")
+
         # Keep track of walls
         self.walls = []
         for i in range(self.height):
@@ -81,8 +278,334 @@ class Maze():
         self.solution = None
 
 
+    def load_array(self, contents):
+        import numpy as np
+
+        # One byte per character; anything outside latin-1 is a wall anyway
+        grid = np.full((self.height, self.width), ord(" "), dtype=np.uint8)
+        for i, line in enumerate(contents):
+            grid[i, :len(line)] = np.frombuffer(line.encode("latin-1", "replace"), dtype=np.uint8)
+
+        self.start = tuple(int(x) for x in np.argwhere(grid == ord("A"))[0])
+        self.goal = tuple(int(x) for x in np.argwhere(grid == ord("B"))[0])
+        self.walls = ~np.isin(grid, (ord(" "), ord("A"), ord("B")))
+
+
+    def load_bits(self, filename):
+        """
+        Memory-maps the file and finds every line end, start and goal in
+        one scan, then packs each line straight into BitWalls, so neither
+        the text nor a per-cell object is ever held in memory. Cells are
+        bytes, so maze files are expected to be ASCII.
+        """
+        with open(filename, "rb") as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            line_starts = [0]
+            markers = {b"A": [], b"B": []}
+            for match in re.finditer(rb"[AB\n]", data):
+                if match.group() == b"\n":
+                    line_starts.append(match.end())
+                else:
+                    markers[match.group()].append(match.start())
+            if line_starts[-1] != len(data):
+                line_starts.append(len(data) + 1)
+
+            if len(markers[b"A"]) != 1:
+                raise Exception("maze must have exactly one start point")
+            if len(markers[b"B"]) != 1:
+                raise Exception("maze must have exactly one goal")
+
+            # Line i spans line_starts[i] to line_starts[i + 1] - 1, less any \r
+            ends = [end - 1 - (data[end - 2:end - 1] == b"\r") for end in line_starts[1:]]
+            self.height = len(ends)
+            self.width = max(end - start for start, end in zip(line_starts, ends))
+
+            def cell(position):
+                row = bisect_right(line_starts, position) - 1
+                return (row, position - line_starts[row])
+
+            self.start = cell(markers[b"A"][0])
+            self.goal = cell(markers[b"B"][0])
+
+            self.walls = BitWalls(self.height, self.width)
+            stride = self.walls.stride
+            for row, (start, end) in enumerate(zip(line_starts, ends)):
+                if end > start:
+                    digits = data[start:end].translate(WALL_DIGITS)
+                    packed = int(digits.ljust(stride * 8, b"0"), 2).to_bytes(stride, "big")
+                    self.walls.bits[row * stride:(row + 1) * stride] = packed
+
+
+    def wall_array(self):
+        """Walls as a 2-D numpy boolean array, whichever backend loaded them."""
+        import numpy as np
+        return np.asarray(self.walls, dtype=bool)
+
+
+    def distance_field(self):
+        """
+        Moves from every cell to the goal, or -1 where the goal is
+        unreachable, as a numpy int32 array.
+
+        Runs BFS from the goal one wavefront at a time: each step offsets
+        the whole frontier's flat indices in the four directions at once
+        and keeps the open, unvisited cells, so Python only loops once per
+        distance rather than once per cell.
+        """
+        import numpy as np
+
+        # A border of walls round the grid means offsets never leave it
+        width = self.width + 2
+        open_cells = np.zeros((self.height + 2, width), dtype=bool)
+        open_cells[1:-1, 1:-1] = ~self.wall_array()
+        open_cells = open_cells.ravel()
+
+        distances = np.full(open_cells.size, -1, dtype=np.int32)
+        goal = (self.goal[0] + 1) * width + self.goal[1] + 1
+        distances[goal] = 0
+        offsets = np.array([-width, width, -1, 1])
+        frontier = np.array([goal])
+        distance = 0
+        while frontier.size:
+            distance += 1
+            candidates = (frontier[:, None] + offsets).ravel()
+            candidates = np.unique(candidates[open_cells[candidates] & (distances[candidates] < 0)])
+            distances[candidates] = distance
+            frontier = candidates
+        return distances.reshape(self.height + 2, width)[1:-1, 1:-1]
+
+
+    def solve_wavefront(self):
+        """
+        Solves the maze by computing distance_field and walking downhill
+        from the start. Every cell the wavefront reached counts as explored.
+        """
+        distances = self.distance_field()
+        self.explored = CellMask(distances >= 0)
+        self.num_explored = len(self.explored)
+        if distances[self.start] < 0:
+            raise Exception("no solution")
+
+        actions = []
+        cells = []
+        row, col = self.start
+        for distance in range(int(distances[self.start]) - 1, -1, -1):
+            for action, dr, dc in MOVES:
+                r, c = row + dr, col + dc
+                if 0 <= r < self.height and 0 <= c < self.width and distances[r, c] == distance:
+                    break
+            actions.append(action)
+            cells.append((r, c))
+            row, col = r, c
+        self.solution = (actions, cells)
+
+
+    def is_open(self, row, col):
+        return 0 <= row < self.height and 0 <= col < self.width and not self.walls[row][col]
+
+
+    def jump(self, row, col, dr, dc):
+        """
+        Steps from (row, col) in direction (dr, dc) and returns the first
+        jump point, or None if a wall comes first.
+
+        Shortest paths are taken to make their vertical moves as early as
+        possible, so a horizontal run only stops where a wall behind it
+        has just ended (a forced turn) and a vertical run stops wherever a
+        horizontal run from it would find a jump point.
+        """
+        while True:
+            row += dr
+            col += dc
+            if not self.is_open(row, col):
+                return None
+            if (row, col) == self.goal:
+                return (row, col)
+            if dc:
+                for side in (-1, 1):
+                    if self.is_open(row + side, col) and not self.is_open(row + side, col - dc):
+                        return (row, col)
+            elif self.jump(row, col, 0, -1) or self.jump(row, col, 0, 1):
+                return (row, col)
+
+
+    def jump_directions(self, cell, direction):
+        """Directions worth jumping in from a cell reached moving in direction."""
+        if direction is None:
+            return [(dr, dc) for _, dr, dc in MOVES]
+        dr, dc = direction
+        if dr:
+            return [(dr, 0), (0, -1), (0, 1)]
+        row, col = cell
+        directions = [(0, dc)]
+        for side in (-1, 1):
+            if self.is_open(row + side, col) and not self.is_open(row + side, col - dc):
+                directions.append((side, 0))
+        return directions
+
+
+    def solve_jps(self):
+        """
+        Jump Point Search: A* over jump points only, with each straight run
+        between them scanned without queueing its cells. self.explored
+        holds the jump points expanded.
+        """
+        self.num_explored = 0
+        self.explored = set()
+
+        # Entries are (f, h, tiebreak, cell, cost, direction), with stale
+        # ones skipped when popped as in PriorityFrontier
+        parents = {self.start: None}
+        costs = {self.start: 0}
+        counter = itertools.count()
+        h = self.distance_to_goal(self.start)
+        frontier = [(h, h, next(counter), self.start, 0, None)]
+        while frontier:
+            _, _, _, cell, cost, direction = heapq.heappop(frontier)
+            if cell in self.explored or cost != costs[cell]:
+                continue
+            self.num_explored += 1
+            if cell == self.goal:
+                self.solution = self.jump_path(parents)
+                return
+            self.explored.add(cell)
+
+            for dr, dc in self.jump_directions(cell, direction):
+                point = self.jump(cell[0], cell[1], dr, dc)
+                if point is None or point in self.explored:
+                    continue
+                g = cost + abs(point[0] - cell[0]) + abs(point[1] - cell[1])
+                if g < costs.get(point, g + 1):
+                    costs[point] = g
+                    parents[point] = cell
+                    h = self.distance_to_goal(point)
+                    heapq.heappush(frontier, (g + h, h, next(counter), point, g, (dr, dc)))
+
+        raise Exception("no solution")
+
+
+    def solve_ida(self, table_size=1 << 16):
+        """
+        Iterative-deepening A*: repeated depth-first searches that cut off
+        at f = g + h above a bound, raising the bound each round to the
+        smallest f that was cut. Memory is the current path plus at most
+        table_size cells remembered per round to prune repeat visits.
+        table_size=0 gives pure O(path length) memory, at the price of
+        searching every route into a cell again, which is exponential in
+        open areas.
+
+        Counts every expansion in num_explored, the rounds in
+        num_iterations and, in num_reexpanded, expansions of states that
+        already lay within the previous round's bound and so were expanded
+        before. IDA* keeps no explored set, so self.explored stays empty.
+        """
+        self.num_explored = 0
+        self.num_reexpanded = 0
+        self.num_iterations = 0
+        self.explored = set()
+
+        # No path without repeated cells is longer than the open cells
+        longest = sum(not wall for row in self.walls for wall in row)
+
+        bound = self.distance_to_goal(self.start)
+        previous = -1
+        while True:
+            self.num_iterations += 1
+            solution, next_bound = self.bounded_search(bound, previous, table_size)
+            if solution is not None:
+                self.solution = solution
+                return
+            if next_bound is None or next_bound > longest:
+                raise Exception("no solution")
+            previous, bound = bound, next_bound
+
+
+    def bounded_search(self, bound, previous, table_size):
+        """
+        One IDA* round as an explicit-stack depth-first search, trying the
+        neighbours nearest the goal first. Returns (solution, None) if the
+        goal is within bound, else (None, smallest f that exceeded it) or
+        (None, None) when nothing did.
+        """
+        def children(state):
+            return iter(sorted(self.neighbors(state),
+                               key=lambda child: self.distance_to_goal(child[1])))
+
+        path = [self.start]
+        actions = []
+        on_path = {self.start}
+        stack = [children(self.start)]
+        table = {}
+        cut = None
+        self.num_explored += 1
+        if self.distance_to_goal(self.start) <= previous:
+            self.num_reexpanded += 1
+
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                on_path.discard(path.pop())
+                if actions:
+                    actions.pop()
+                continue
+
+            action, state = child
+            if state in on_path:
+                continue
+            g = len(path)
+            f = g + self.distance_to_goal(state)
+            if f > bound:
+                if cut is None or f < cut:
+                    cut = f
+                continue
+            if state == self.goal:
+                return (actions + [action], path[1:] + [state]), None
+
+            # A cell already reached this round at no greater cost has
+            # had everything below it searched with at least this budget
+            if table_size:
+                seen = table.get(state)
+                if seen is not None and seen <= g:
+                    continue
+                if seen is not None or len(table) < table_size:
+                    table[state] = g
+
+            self.num_explored += 1
+            if f <= previous:
+                self.num_reexpanded += 1
+            path.append(state)
+            on_path.add(state)
+            actions.append(action)
+            stack.append(children(state))
+        return None, cut
+
+
+    def jump_path(self, parents):
+        """Expands the jump points leading to the goal back into (actions, cells)."""
+        points = []
+        cell = self.goal
+        while cell is not None:
+            points.append(cell)
+            cell = parents[cell]
+        points.reverse()
+
+        names = {(dr, dc): action for action, dr, dc in MOVES}
+        actions = []
+        cells = []
+        for (row, col), (end_row, end_col) in zip(points, points[1:]):
+            dr = (end_row > row) - (end_row < row)
+            dc = (end_col > col) - (end_col < col)
+            while (row, col) != (end_row, end_col):
+                row += dr
+                col += dc
+                actions.append(names[(dr, dc)])
+                cells.append((row, col))
+        return actions, cells
+
+
     def print(self):
-        solution = self.solution[1] if self.solution is not None else None
+        solution = set(self.solution[1]) if self.solution is not None else None
         print()
         for i, row in enumerate(self.walls):
             for j, col in enumerate(row):
@@ -116,16 +639,47 @@ class Maze():
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def distance_to_goal(self, state):
+        """Manhattan distance, a lower bound on the moves left from state."""
+        return abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
+
+    def frontier_for(self, algorithm):
+        if algorithm == "dfs":
+            return HashStackFrontier()
+        elif algorithm == "bfs":
+            return HashQueueFrontier()
+        elif algorithm == "greedy":
+            return PriorityFrontier(lambda node: self.distance_to_goal(node.state))
+        elif algorithm == "astar":
+            # Ties on f go to the node nearest the goal, which on open floor
+            # follows one shortest path instead of fanning out across many
+            return PriorityFrontier(lambda node: (
+                node.cost + self.distance_to_goal(node.state),
+                self.distance_to_goal(node.state),
+            ))
+        raise ValueError(f"unknown algorithm: {algorithm}")
+
+    def solve(self, algorithm="dfs", frontier_class=None):
+        """
+        Finds a solution to maze, if one exists, with one of ALGORITHMS.
+        Passing frontier_class uses that frontier instead.
+        """
+
+        if algorithm == "wavefront" and not frontier_class:
+            return self.solve_wavefront()
+        if algorithm == "jps" and not frontier_class:
+            return self.solve_jps()
+        if algorithm == "idastar" and not frontier_class:
+            return self.solve_ida()
 
         # Keep track of number of states explored
         self.num_explored = 0
 
         # Initialize frontier to just the starting position
         start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
+        frontier = frontier_class() if frontier_class else self.frontier_for(algorithm)
         frontier.add(start)
+        informed = isinstance(frontier, PriorityFrontier)
 
         # Initialize an empty explored set
         self.explored = set()
@@ -159,71 +713,136 @@ class Maze():
 
             # Add neighbors to frontier
             for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
-                    frontier.add(child)
-
-
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
-
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
-
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
-
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
-
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
-
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
-
-                # Empty cell
+                if state in self.explored:
+                    continue
+                if not frontier.contains_state(state):
+                    frontier.add(Node(state=state, parent=node, action=action, cost=node.cost + 1))
+                elif informed:
+                    frontier.decrease(Node(state=state, parent=node, action=action,
+                                           cost=node.cost + 1))
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False,
+                     cell_size=50, cell_border=2, tile=None):
+        """
+        Renders the maze as an image. Cell colors are computed for the
+        whole grid as one array and scaled up with a single resize, rather
+        than drawn one rectangle at a time. With tile=N, writes N x N cell
+        tiles named <name>_<row>_<col>.<ext> instead of one image.
+        """
+        colors = self.cell_colors(show_solution, show_explored)
+        if tile is None:
+            render_cells(colors, cell_size, cell_border).save(filename)
+            return
+
+        name, ext = os.path.splitext(filename)
+        for row in range(0, self.height, tile):
+            for col in range(0, self.width, tile):
+                image = render_cells(colors[row:row + tile, col:col + tile], cell_size, cell_border)
+                image.save(f"{name}_{row // tile}_{col // tile}{ext}")
+
+
+    def cell_colors(self, show_solution=True, show_explored=False):
+        """RGB color of every cell as a (height, width, 3) numpy array."""
+        import numpy as np
+
+        # Empty cell
+        colors = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        colors[:] = (237, 240, 252)
+
+        # Later layers paint over earlier ones, so they go from lowest
+        # priority to highest
+        if self.solution is not None:
+
+            # Explored
+            if show_explored:
+                if isinstance(self.explored, CellMask):
+                    colors[self.explored.mask] = (212, 97, 85)
                 else:
-                    fill = (237, 240, 252)
-
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
-
-        img.save(filename)
-
-
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
-
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+                    colors[self.cell_mask(self.explored)] = (212, 97, 85)
+
+            # Solution
+            if show_solution:
+                colors[self.cell_mask(self.solution[1])] = (220, 235, 113)
+
+        # Start
+        colors[self.start] = (255, 0, 0)
+
+        # Goal
+        colors[self.goal] = (0, 171, 28)
+
+        # Walls
+        colors[self.wall_array()] = (40, 40, 40)
+        return colors
+
+
+    def cell_mask(self, cells):
+        import numpy as np
+        mask = np.zeros((self.height, self.width), dtype=bool)
+        cells = np.array(list(cells), dtype=np.intp).reshape(-1, 2)
+        mask[cells[:, 0], cells[:, 1]] = True
+        return mask
+
+
+def render_cells(colors, cell_size=50, cell_border=2):
+    """
+    Scales a (rows, cols, 3) array of cell colors up to cell_size pixels
+    per cell with one nearest-neighbour resize, then blacks out a
+    cell_border frame round every cell with one stripe per grid line.
+    """
+    from PIL import Image, ImageDraw
+
+    rows, cols = colors.shape[:2]
+    width = cols * cell_size
+    height = rows * cell_size
+    image = Image.fromarray(colors, "RGB").resize((width, height), Image.Resampling.NEAREST)
+
+    # Cell k covers pixels k * cell_size + cell_border through
+    # (k + 1) * cell_size - cell_border, so each line between cells is the
+    # 2 * cell_border - 1 pixels centred on k * cell_size
+    if cell_border > 0:
+        draw = ImageDraw.Draw(image)
+        for k in range(rows + 1):
+            top = max(k * cell_size - cell_border + 1, 0)
+            bottom = min(k * cell_size + cell_border - 1, height - 1)
+            if top <= bottom:
+                draw.rectangle([(0, top), (width - 1, bottom)], fill="black")
+        for k in range(cols + 1):
+            left = max(k * cell_size - cell_border + 1, 0)
+            right = min(k * cell_size + cell_border - 1, width - 1)
+            if left <= right:
+                draw.rectangle([(left, 0), (right, height - 1)], fill="black")
+    return image
+
+
+def compare_algorithms(maze):
+    print(f"{'algorithm':>9} {'explored':>9} {'length':>7} {'seconds':>9}")
+    for algorithm in ALGORITHMS:
+        start = time.perf_counter()
+        maze.solve(algorithm)
+        elapsed = time.perf_counter() - start
+        print(f"{algorithm:>9} {maze.num_explored:>9} {len(maze.solution[0]):>7} {elapsed:>9.3f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3) or (len(sys.argv) == 3 and sys.argv[2] not in ALGORITHMS + ("all",)):
+        sys.exit(f"Usage: python maze.py maze.txt [{'|'.join(ALGORITHMS)}|all]")
+    algorithm = sys.argv[2] if len(sys.argv) == 3 else "dfs"
+
+    m = Maze(sys.argv[1], backend="numpy" if algorithm == "wavefront" else "list")
+    if algorithm == "all":
+        compare_algorithms(m)
+        sys.exit()
+
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    start = time.perf_counter()
+    m.solve(algorithm)
+    print("States Explored:", m.num_explored)
+    if algorithm == "idastar":
+        print(f"Re-expansions: {m.num_reexpanded} over {m.num_iterations} iterations")
+    print(f"Time: {time.perf_counter() - start:.3f}s")
+    print("Solution:")
+    m.print()
+    m.output_image("maze.png", show_explored=True)